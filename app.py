@@ -1,14 +1,29 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
+from flask import Flask, render_template, stream_template, request, redirect, url_for, flash, jsonify, send_from_directory, session, g
 from flask_mail import Mail, Message
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import wraps
+import hmac
 import os
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
-from database import get_db_service
+from database import get_db_service, decode_cursor
+from cache import content_cache, create_bus, page_key
+from models import Article
+from ratelimit import FormLimiter, create_store
+from compression import CompressionMiddleware
 import traceback
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Trust X-Forwarded-For from our own proxies so rate limits see the real client IP
+if app.config['PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_COUNT'])
+
+# Compress HTML, CSS, JS and JSON responses (gzip, or brotli when installed)
+app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+
 # Initialize Flask-Mail (with error handling)
 try:
     mail = Mail(app)
@@ -19,23 +34,220 @@ except Exception as e:
     email_configured = False
     mail = None
 
+# Rate limiting for the form endpoints
+form_limiter = FormLimiter(
+    create_store(app.config['RATE_LIMIT_REDIS_URL']),
+    'forms',
+    per_ip=(app.config['FORM_RATE_PER_IP_BURST'], app.config['FORM_RATE_PER_IP_PER_MINUTE'] / 60),
+    global_=(app.config['FORM_RATE_GLOBAL_BURST'], app.config['FORM_RATE_GLOBAL_PER_MINUTE'] / 60),
+    max_in_flight=app.config['FORM_MAX_IN_FLIGHT'],
+    max_queue_ms=app.config['FORM_MAX_QUEUE_MS']
+)
+
+def rate_limited(view):
+    """Reject form submissions quickly when over the rate limit or under load"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'POST':
+            return view(*args, **kwargs)
+        try:
+            decision = form_limiter.check(request.remote_addr or 'unknown', request.headers.get('X-Request-Start'))
+        except Exception as e:
+            # Never let a limiter failure take the forms down
+            print(f"Rate limiter error: {e}")
+            return view(*args, **kwargs)
+        if not decision.allowed:
+            retry_after = max(1, int(decision.retry_after + 0.999))
+            message = f"{decision.reason}. Please try again in {retry_after} seconds."
+            return message, decision.status, {'Retry-After': str(retry_after), 'Content-Type': 'text/plain; charset=utf-8'}
+        try:
+            return view(*args, **kwargs)
+        finally:
+            form_limiter.release()
+    return wrapper
+
+# Placeholders from env_template.txt, which must never work as real secrets
+PLACEHOLDER_SECRETS = {'your-webhook-secret-here', 'your-metrics-token-here'}
+
+def configured_secret(name):
+    """A shared secret from the config, or None if it is unset or still the template's placeholder"""
+    value = (app.config.get(name) or '').strip()
+    if value in PLACEHOLDER_SECRETS:
+        print(f"Warning: {name} is still the placeholder from env_template.txt, ignoring it")
+        return None
+    return value or None
+
+# Cache helper functions
+def cached_data(key, loader):
+    """Get content from the cache, loading it from the database on a miss"""
+    value = content_cache.fetch(key, loader)
+    if not value:
+        # Don't cache a page built from empty (possibly failed) queries
+        g.cache_incomplete = True
+    return value
+
+def cached_page(view):
+    """Serve the rendered page from the cache until its content changes"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Pages render flashed messages, so those responses are never shared
+        if '_flashes' in session:
+            return view(*args, **kwargs)
+        key = page_key(request.path)
+        html = content_cache.get(key)
+        if html is not None:
+            return html
+        generation = content_cache.generation
+        rv = view(*args, **kwargs)
+        if isinstance(rv, str) and not g.get('cache_incomplete'):
+            content_cache.set(key, rv, generation=generation)
+        elif isinstance(rv, app.response_class) and rv.is_streamed and rv.status_code == 200:
+            # Streamed pages are cached once the last chunk has been sent
+            rv.response = _cache_stream(rv.response, key, generation, g._get_current_object())
+        return rv
+    return wrapper
+
+def _cache_stream(chunks, key, generation, flags):
+    """Pass a streamed page through while collecting it for the page cache"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    # Only reached once every chunk was rendered and sent: a template error
+    # raises out of the loop, and a client disconnect closes the generator
+    if not flags.get('cache_incomplete'):
+        content_cache.set(key, ''.join(parts), generation=generation)
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+def stream_page(template_name, load=None, **context):
+    """Render a template as a stream
+    
+    Everything up to </head> is sent as soon as it is rendered so the browser
+    can start fetching CSS and JS; the body follows in larger chunks. load, if
+    given, runs once the head has been sent and fills in objects already in
+    the context (Jinja reads each context variable when rendering starts, so
+    it must add to them rather than replace them).
+    """
+    # Called here, inside the request; the stream keeps the request context
+    parts = stream_template(template_name, **context)
+    
+    def chunks():
+        buffer = []
+        size = 0
+        head_sent = False
+        try:
+            for part in parts:
+                buffer.append(part)
+                size += len(part)
+                if (not head_sent and '</head>' in part) or size >= STREAM_CHUNK_SIZE:
+                    yield ''.join(buffer)
+                    buffer = []
+                    size = 0
+                    if not head_sent and load is not None:
+                        load()
+                    head_sent = True
+            if buffer:
+                yield ''.join(buffer)
+        except Exception as e:
+            # The status line is already sent, so the only way to signal the
+            # error is to cut the response short; never cache what was sent
+            g.cache_incomplete = True
+            print(f"Error streaming {template_name}: {e}")
+            traceback.print_exc()
+            raise
+    return app.response_class(chunks(), mimetype='text/html')
+
+_warm_executor = ThreadPoolExecutor(max_workers=1)
+
+def _render_pages(paths):
+    """Re-render pages through the app so they land in the page cache"""
+    client = app.test_client(use_cookies=False)
+    for path in paths:
+        try:
+            # Buffered, so streamed pages are read to the end and cached
+            client.get(path, base_url=app.config['SITE_URL'], buffered=True)
+        except Exception as e:
+            print(f"Error warming {path}: {e}")
+
+def warm_pages(paths):
+    """Re-render purged pages in the background"""
+    _warm_executor.submit(_render_pages, list(paths))
+
+content_cache.set_warmer(warm_pages)
+
+# Each gunicorn worker has its own cache: share purges between them
+cache_bus = create_bus(app.config['CACHE_REDIS_URL'])
+content_cache.set_bus(cache_bus)
+if cache_bus is None and int(os.environ.get('WEB_CONCURRENCY') or 1) > 1:
+    print(f"Warning: {os.environ['WEB_CONCURRENCY']} workers share no content cache purges; set CACHE_REDIS_URL, "
+          f"or other workers serve edited pages for up to CACHE_TTL ({app.config['CACHE_TTL']} s)")
+
+# Template filters for linking names to author pages. The slugs come from the
+# database (migration 004 is the only place names are normalized), looked up
+# for the whole page by load_author_links before it renders
+def load_author_links(bylines=(), names=()):
+    """Look up the author slugs of the bylines and names a page shows"""
+    links = g.setdefault('author_links', {})
+    db = get_db_service()
+    for values, split in ((bylines, True), (names, False)):
+        values = sorted({value for value in values if value} - {value for value, s in links if s == split})
+        if not values:
+            continue
+        rows = db.get_author_links(values, split) if db else None
+        if rows is None:
+            # Shown without links, so not cached
+            g.cache_incomplete = True
+            continue
+        for value in values:
+            links[(value, split)] = []
+        for row in rows:
+            links[(row['value'], split)].append((row['name'], row['slug']))
+
+@app.template_filter('author_slug')
+def author_slug(name):
+    """Slug of the author page for a person's name, or '' if it has none"""
+    links = g.get('author_links', {}).get((name, False))
+    return links[0][1] if links else ''
+
+@app.template_filter('author_links')
+def author_links(byline):
+    """(name, slug) for each person credited in an article byline"""
+    links = g.get('author_links', {}).get((byline, True))
+    if not links:
+        return [(byline, '')] if byline else []
+    return links
+
 # Database helper functions
+def empty_issue_details():
+    """Details shown for an issue whose articles, contributors, or photos failed to load"""
+    return {
+        'featured_articles': [],
+        'contributors': {'editorial_team': [], 'featured_writers': [], 'photographers': []},
+        'gallery': []
+    }
+
 def get_magazine_issues():
     """Get magazine issues from database with fallback to empty data"""
     try:
         db = get_db_service()
         if db:
-            issues = db.get_all_issues()
+            issues = cached_data('issues', db.get_all_issues)
             if issues:
                 # Enrich issues with articles, contributors, and photos
+                enriched = []
                 for issue in issues:
-                    issue['featured_articles'] = db.get_articles_by_issue(issue['id'])
-                    issue['contributors'] = db.get_contributors_by_issue(issue['id'])
-                    issue['gallery'] = db.get_photos_by_issue(issue['id'])
+                    # None when a query failed: cached_data keeps it out of the
+                    # cache and marks the page incomplete so it isn't cached either
+                    details = cached_data(f"issue:{issue['id']}",
+                                          lambda issue_id=issue['id']: db.get_issue_details(issue_id))
+                    # Copy so per-request changes never touch the cached rows
+                    issue = issue.copy(**(details or empty_issue_details()))
                     # Ensure journal_type is set (default to 'literary' if not specified)
-                    if 'journal_type' not in issue or not issue['journal_type']:
+                    if not issue.get('journal_type'):
                         issue['journal_type'] = 'literary'
-                return issues
+                    enriched.append(issue)
+                return enriched
     except Exception as e:
         print(f"Database error: {e}")
         traceback.print_exc()
@@ -48,7 +260,7 @@ def get_moments_data():
     try:
         db = get_db_service()
         if db:
-            moments = db.get_all_moments()
+            moments = cached_data('moments', db.get_all_moments)
             if moments:
                 return moments
     except Exception as e:
@@ -58,40 +270,72 @@ def get_moments_data():
     # Return empty data if database is not available
     return []
 
+def get_gallery_page(db, cursor=None, limit=None):
+    """Get a page of gallery images, caching only the pages the site links to
+    
+    The first page, and the pages behind cursors the site handed out, are
+    cached at the default page size. Any other cursor or limit goes straight
+    to the database, so made-up query strings cannot grow the cache.
+    """
+    limit = limit or app.config['GALLERY_PAGE_SIZE']
+    if limit != app.config['GALLERY_PAGE_SIZE'] or (cursor and cursor not in content_cache.get('gallery:cursors', ())):
+        return db.get_gallery_page(limit, cursor)
+    
+    key = f"gallery:{cursor or 'first'}"
+    page = content_cache.get(key)
+    if page is None:
+        generation = content_cache.generation
+        page = db.get_gallery_page(limit, cursor)
+        if page is None:
+            return None
+        content_cache.set(key, page, generation=generation)
+        if page['next_cursor']:
+            # Purged with the pages by 'gallery:*', so old cursors stop being cached
+            issued = content_cache.get('gallery:cursors', frozenset())
+            content_cache.set('gallery:cursors', issued | {page['next_cursor']}, generation=generation)
+    return page
+
 @app.route('/')
+@cached_page
 def home():
     try:
         db = get_db_service()
         if db:
             issues = get_magazine_issues()
             latest_issue = issues[0] if issues else None
-            gallery_images = db.get_gallery_images()
-            print(f"DEBUG: Found {len(gallery_images)} gallery images")
-            for i, img in enumerate(gallery_images):
-                print(f"DEBUG: Image {i+1}: {img}")
+            gallery = get_gallery_page(db)
+            if gallery is None:
+                g.cache_incomplete = True
+                gallery = {}
+            gallery_images = gallery.get('images', [])
+            gallery_cursor = gallery.get('next_cursor')
         else:
             issues = []
             latest_issue = None
             gallery_images = []
+            gallery_cursor = None
     except Exception as e:
         print(f"Database error: {e}")
         issues = []
         latest_issue = None
         gallery_images = []
+        gallery_cursor = None
     
     # You can set these URLs from your Supabase Storage or environment variables
     club_logo_url = "https://kxxlyyqrzsxrzfwjadvg.supabase.co/storage/v1/object/public/magazine-assets/logos/fiction-poetry-club-logo.png"
     hero_video_url = "https://kxxlyyqrzsxrzfwjadvg.supabase.co/storage/v1/object/public/magazine-assets/videos/purple_background.mp4"
-    return render_template('home.html', latest_issue=latest_issue, issues=issues, club_logo_url=club_logo_url, hero_video_url=hero_video_url, gallery_images=gallery_images)
+    return render_template('home.html', latest_issue=latest_issue, issues=issues, club_logo_url=club_logo_url, hero_video_url=hero_video_url, gallery_images=gallery_images, gallery_cursor=gallery_cursor)
 
 @app.route('/mapao')
+@cached_page
 def mapao():
-    issues = get_magazine_issues()
-    latest_issue = issues[0] if issues else None
-    return render_template('mapao.html', latest_issue=latest_issue, issues=issues)
+    # Filled in after the head is sent; the template picks the latest issue
+    issues = []
+    return stream_page('mapao.html', load=lambda: issues.extend(get_magazine_issues()), issues=issues)
 
 
 @app.route('/issue/<int:issue_id>')
+@cached_page
 def issue_detail(issue_id):
     issues = get_magazine_issues()
     issue = next((issue for issue in issues if issue['id'] == issue_id), None)
@@ -99,6 +343,11 @@ def issue_detail(issue_id):
         flash('Issue not found!', 'error')
         return redirect(url_for('issues'))
     
+    # Copies, so the cached issue data stays without the article text
+    articles = [article.copy() for article in issue.get('featured_articles', [])]
+    if 'featured_articles' in issue:
+        issue['featured_articles'] = articles
+    
     # Organize articles by category for dropdown menu
     if 'featured_articles' in issue:
         articles_by_category = {}
@@ -109,15 +358,23 @@ def issue_detail(issue_id):
             articles_by_category[category].append(article)
         issue['articles_by_category'] = articles_by_category
     
-    return render_template('issue_detail.html', issue=issue)
+    def load():
+        Article.load_deferred(articles)
+        members = [member for team in issue.get('contributors', {}).values() for member in team]
+        load_author_links(bylines=[article.get('author') for article in articles],
+                          names=[member.get('name') for member in members])
+    
+    # The text of every article and the author links are fetched once the head is sent
+    return stream_page('issue_detail.html', load=load, issue=issue)
 
 @app.route('/about')
+@cached_page
 def about():
     try:
         db = get_db_service()
         if db:
-            research_team = db.get_editorial_team('research_wing')
-            literary_team = db.get_editorial_team('literary_wing')
+            research_team = cached_data('team:research_wing', lambda: db.get_editorial_team('research_wing'))
+            literary_team = cached_data('team:literary_wing', lambda: db.get_editorial_team('literary_wing'))
         else:
             research_team = []
             literary_team = []
@@ -129,6 +386,7 @@ def about():
     return render_template('about.html', research_team=research_team, literary_team=literary_team)
 
 @app.route('/contact', methods=['GET', 'POST'])
+@rate_limited
 def contact():
     if request.method == 'POST':
         name = request.form.get('name')
@@ -196,6 +454,7 @@ Fiction & Poetry Club Manipur
     return render_template('contact.html')
 
 @app.route('/subscribe', methods=['POST'])
+@rate_limited
 def subscribe():
     email = request.form.get('email')
     if email:
@@ -246,6 +505,7 @@ Fiction & Poetry Club Manipur
         return redirect(url_for('home'))
 
 @app.route('/moments')
+@cached_page
 def moments():
     moments_data = get_moments_data()
     return render_template('moments.html', moments=moments_data)
@@ -263,12 +523,13 @@ def sitemap_xml():
     return send_from_directory(os.path.join(app.root_path, 'static'), 'sitemap.xml', mimetype='application/xml')
 
 @app.route('/awards')
+@cached_page
 def awards():
     try:
         db = get_db_service()
         if db:
-            awards = db.get_all_awards()
-            years = db.get_awards_years()
+            awards = cached_data('awards', db.get_all_awards)
+            years = cached_data('award_years', db.get_awards_years)
         else:
             awards = []
             years = []
@@ -280,11 +541,12 @@ def awards():
     return render_template('awards.html', awards=awards, years=years)
 
 @app.route('/awards/<int:award_id>')
+@cached_page
 def award_detail(award_id):
     try:
         db = get_db_service()
         if db:
-            award = db.get_award_by_id(award_id)
+            award = cached_data(f"award:{award_id}", lambda: db.get_award_by_id(award_id))
         else:
             award = None
     except Exception as e:
@@ -295,15 +557,17 @@ def award_detail(award_id):
         flash('Award not found!', 'error')
         return redirect(url_for('awards'))
     
+    load_author_links(names=[award.get('awardee_name')])
     return render_template('award_detail.html', award=award)
 
 @app.route('/whos-who')
+@cached_page
 def whos_who():
     try:
         db = get_db_service()
         if db:
-            people = db.get_all_whos_who()
-            letters = db.get_whos_who_letters()
+            people = cached_data('whos_who', db.get_all_whos_who)
+            letters = cached_data('whos_who_letters', db.get_whos_who_letters)
         else:
             people = []
             letters = []
@@ -315,11 +579,12 @@ def whos_who():
     return render_template('whos_who.html', people=people, letters=letters)
 
 @app.route('/whos-who/<int:person_id>')
+@cached_page
 def whos_who_detail(person_id):
     try:
         db = get_db_service()
         if db:
-            person = db.get_whos_who_by_id(person_id)
+            person = cached_data(f"whos_who:{person_id}", lambda: db.get_whos_who_by_id(person_id))
         else:
             person = None
     except Exception as e:
@@ -330,8 +595,103 @@ def whos_who_detail(person_id):
         flash('Person not found!', 'error')
         return redirect(url_for('whos_who'))
     
+    load_author_links(names=[person.get('name')])
     return render_template('whos_who_detail.html', person=person)
 
+@app.route('/authors/<slug>')
+@cached_page
+def author_detail(slug):
+    try:
+        db = get_db_service()
+        if db:
+            author = cached_data(f"author:{slug}", lambda: db.get_author_by_slug(slug))
+        else:
+            author = None
+    except Exception as e:
+        print(f"Error fetching author {slug}: {e}")
+        db = author = None
+    
+    if author is None and db:
+        # Send links written by hand ('Dr-Thangjam-Singh') to the canonical slug
+        links = db.get_author_links([slug.replace('-', ' ')]) or []
+        canonical = links[0]['slug'] if links else ''
+        if canonical and canonical != slug:
+            return redirect(url_for('author_detail', slug=canonical), code=301)
+    
+    if author is None:
+        flash('Author not found!', 'error')
+        return redirect(url_for('whos_who'))
+    
+    return render_template('author.html', author=author)
+
+@app.route('/api/gallery')
+def gallery_api():
+    """Get the next page of gallery images for the home page carousel"""
+    cursor = request.args.get('cursor') or None
+    limit = min(max(request.args.get('limit', app.config['GALLERY_PAGE_SIZE'], type=int), 1), 24)
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    db = get_db_service()
+    if not db:
+        return jsonify({'error': 'Gallery unavailable'}), 503
+    
+    page = get_gallery_page(db, cursor, limit)
+    if page is None:
+        return jsonify({'error': 'Gallery unavailable'}), 503
+    
+    # Browsers must check back, so a purged page is not served stale
+    response = jsonify(page)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/metrics/limits')
+def limit_metrics():
+    """Expose the rate limiting and load shedding counters for monitoring"""
+    token = configured_secret('METRICS_TOKEN')
+    if not token:
+        return jsonify({'error': 'Metrics not configured'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+    try:
+        return jsonify(form_limiter.stats())
+    except Exception as e:
+        print(f"Error reading limiter stats: {e}")
+        return jsonify({'error': 'Limiter stats unavailable'}), 503
+
+@app.route('/webhooks/db-change', methods=['POST'])
+def db_change_webhook():
+    """Receive Supabase database webhook events and purge the affected cache entries"""
+    secret = configured_secret('WEBHOOK_SECRET')
+    if not secret:
+        return jsonify({'error': 'Webhook not configured'}), 404
+    
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {secret}".encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Payload must be a JSON object'}), 400
+    table = payload.get('table')
+    if not table:
+        return jsonify({'error': 'Missing table'}), 400
+    record, old_record = payload.get('record'), payload.get('old_record')
+    if not isinstance(table, str) or not all(row is None or isinstance(row, dict) for row in (record, old_record)):
+        return jsonify({'error': 'table must be a string, record and old_record objects or null'}), 400
+    
+    # The author pages showing the row, before and after the change; every
+    # author page is purged if they cannot be looked up
+    db = get_db_service()
+    authors = db.get_credited_slugs(table, [record, old_record]) if db else None
+    purged = content_cache.invalidate(table, record, old_record, authors=authors)
+    return jsonify({'type': payload.get('type'), 'table': table, 'purged': purged}), 202
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Which rows credit which authors.
+
+The same person is written many ways across issues, awards and Who's Who
+('Dr. Thangjam Ibopishak Singh', 'Thangjam Ibopishak Singh'). Migration 004
+reduces each name to the slug that keys the authors table, and that SQL is
+the only place names are normalized: the app asks the database for slugs
+(DatabaseService.get_author_links and get_credited_slugs) rather than working
+them out itself, so its links and cache keys always match the index.
+"""
+
+from typing import Iterable, List, Tuple
+
+from config import Config
+
+# Table -> (column holding the person's name, whether it can list several people)
+AUTHOR_SOURCES = {
+    Config.ARTICLES_TABLE: ('author', True),
+    Config.CONTRIBUTORS_TABLE: ('name', False),
+    'awards': ('awardee_name', False),
+    'whos_who': ('name', False),
+}
+
+
+def credited_values(table: str, rows: Iterable) -> Tuple[List[str], bool]:
+    """Name values the rows of table credit, and whether each can list several people"""
+    if table not in AUTHOR_SOURCES:
+        return [], False
+    column, split = AUTHOR_SOURCES[table]
+    values = {row.get(column) for row in rows if row and row.get(column)}
+    return sorted(values), split
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Bulk import and export of magazine content
+
+Imports a whole issue from a manifest file and a media directory in a handful
+of batched upserts, and streams the archive to NDJSON for backups.
+
+Usage:
+    python bulk_content.py import issue.yaml [--media DIR] [--chunk-size 200] [--jobs 8]
+    python bulk_content.py export backup.ndjson.gz
+    python bulk_content.py restore backup.ndjson.gz
+
+Imports are idempotent: rows are upserted on their natural keys (the issue's
+import_key, which defaults to a slug of its title; the article's import_key
+within the issue, which defaults to a slug of its title numbered from the
+second one with the same slug; contributor name/role and photo filename
+within the issue, see migrations/003_import_keys.sql), so running the same manifest twice updates
+rather than duplicates. Set import_key explicitly before renaming an issue
+that has already been imported, or the next import creates a new issue. Progress is saved next to the manifest in
+<manifest>.state.json, so an interrupted import resumes where it stopped and
+already-uploaded media is not sent again.
+
+Manifest format (YAML needs PyYAML; JSON works with the same structure):
+
+    issue:
+      title: Fall/Winter 2025
+      import_key: fall-winter-2025                    # optional, defaults to a slug of the title
+      release_date: September 2025
+      journal_type: literary
+      description: ...
+      editorial: ...
+      cover_image_url: covers/fall_winter_2025.jpg    # file in the media directory
+      pdf_url: pdf/fall_winter_2025.pdf
+    articles:
+      - title: Paodam Ama
+        import_key: paodam-ama                       # optional, defaults to a slug of the title
+        author: Bijoy
+        category: Poetry
+        content_file: articles/paodam_ama.txt        # or inline "content:"
+    contributors:
+      - name: Bijoy
+        role: Poet
+        role_type: featured_writers
+        photo: contributors/bijoy.jpg
+    photos:
+      - file: gallery/launch.jpg
+        caption: Book launch
+        alt_text: Launch of the Fall/Winter 2025 issue
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import Config
+
+# Tables in the order they are exported and restored (parents before children)
+EXPORT_TABLES = [
+    Config.ISSUES_TABLE,
+    Config.ARTICLES_TABLE,
+    Config.CONTRIBUTORS_TABLE,
+    Config.PHOTOS_TABLE,
+    Config.MOMENTS_TABLE,
+    'awards',
+    'whos_who',
+    'editorial_team',
+]
+
+# Manifest fields that name a file in the media directory, per section
+MEDIA_FIELDS = {
+    'issue': ['cover_image_url', 'pdf_url'],
+    'contributors': ['photo'],
+    'photos': ['file'],
+}
+
+# (table, natural key used for upserts) per manifest section
+SECTIONS = [
+    ('articles', Config.ARTICLES_TABLE, 'issue_id,import_key'),
+    ('contributors', Config.CONTRIBUTORS_TABLE, 'issue_id,name,role_type'),
+    ('photos', Config.PHOTOS_TABLE, 'issue_id,filename'),
+]
+
+
+def open_text(path, mode):
+    """Open a file for text I/O, gzip-compressed when the name ends in .gz"""
+    if path == '-':
+        return sys.stdout if 'w' in mode else sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def load_manifest(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("PyYAML is needed for YAML manifests. Run: pip install pyyaml (or use JSON)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def slugify(text):
+    """'Fall/Winter 2025' -> 'fall-winter-2025' (migration 003 builds the same import keys)"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def article_keys(articles):
+    """Default import keys for an issue's articles: 'untitled', 'untitled--2', ...
+
+    Titles may repeat within an issue, so the second and later articles with
+    the same slug are numbered ('--' never occurs in a slug, so these cannot
+    clash with another title). Migration 003 keys existing articles the same
+    way, in id order.
+    """
+    seen = {}
+    keys = []
+    for article in articles:
+        slug = slugify(article.get('title') or '') or 'article'
+        seen[slug] = seen.get(slug, 0) + 1
+        keys.append(slug if seen[slug] == 1 else f"{slug}--{seen[slug]}")
+    return keys
+
+
+def chunked(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class ImportState:
+    """Progress of an import, saved after every step so it can resume"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {'media': {}, 'chunks': []}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.data.update(json.load(f))
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def media_url(self, key):
+        return self.data['media'].get(key)
+
+    def chunk_done(self, digest):
+        return digest in self.data['chunks']
+
+
+def media_key(media_dir, relpath):
+    """Identify a media file by path, size, and modification time"""
+    stat = os.stat(os.path.join(media_dir, relpath))
+    return f"{relpath}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def upload_media(db, manifest, media_dir, storage_prefix, state, jobs):
+    """Upload every media file the manifest refers to, several at a time"""
+    relpaths = set()
+    for section, fields in MEDIA_FIELDS.items():
+        entries = manifest.get(section) or []
+        for entry in [entries] if isinstance(entries, dict) else entries:
+            relpaths.update(entry[field] for field in fields if entry.get(field))
+
+    urls = {}
+    pending = []
+    for relpath in sorted(relpaths):
+        if re.match(r'^https?://', relpath):
+            urls[relpath] = relpath
+            continue
+        key = media_key(media_dir, relpath)
+        if state.media_url(key):
+            urls[relpath] = state.media_url(key)
+        else:
+            pending.append((relpath, key))
+
+    print(f"🖼️  {len(relpaths)} media files, {len(pending)} to upload")
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(db.upload_media, os.path.join(media_dir, relpath), f"{storage_prefix}/{relpath}"): (relpath, key)
+            for relpath, key in pending
+        }
+        for future in as_completed(futures):
+            relpath, key = futures[future]
+            url = future.result()
+            if url:
+                urls[relpath] = url
+                state.data['media'][key] = url
+                state.save()
+                print(f"  ✅ {relpath}")
+            else:
+                failed.append(relpath)
+                print(f"  ❌ {relpath}")
+
+    if failed:
+        raise RuntimeError(f"{len(failed)} media uploads failed")
+    return urls
+
+
+def issue_row(manifest, urls):
+    row = dict(manifest['issue'])
+    row.setdefault('import_key', slugify(row['title']))
+    for field in MEDIA_FIELDS['issue']:
+        if row.get(field):
+            row[field] = urls[row[field]]
+    return row
+
+
+def section_rows(manifest, section, issue_id, base_dir, urls):
+    """Turn a manifest section into table rows"""
+    entries = manifest.get(section) or []
+    keys = article_keys(entries) if section == 'articles' else [None] * len(entries)
+    rows = []
+    for entry, key in zip(entries, keys):
+        row = dict(entry, issue_id=issue_id)
+        if section == 'articles':
+            row['import_key'] = row.get('import_key') or key
+        if section == 'articles' and 'content_file' in row:
+            with open(os.path.join(base_dir, row.pop('content_file')), encoding='utf-8') as f:
+                row['content'] = f.read()
+        elif section == 'contributors' and row.get('photo'):
+            row['photo'] = urls[row['photo']]
+        elif section == 'photos':
+            relpath = row.pop('file')
+            row['file_url'] = urls[relpath]
+            row.setdefault('filename', os.path.basename(relpath))
+        rows.append(row)
+
+    # Every row in a batch must send the same columns
+    columns = sorted({column for row in rows for column in row})
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+def import_issue(db, manifest_path, media_dir=None, chunk_size=200, jobs=8):
+    """Import one issue manifest, resuming from saved progress"""
+    manifest = load_manifest(manifest_path)
+    if not manifest or not (manifest.get('issue') or {}).get('title'):
+        raise RuntimeError("Manifest must have an issue with a title")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    media_dir = os.path.abspath(media_dir) if media_dir else base_dir
+    state = ImportState(manifest_path + '.state.json')
+    title = manifest['issue']['title']
+    print(f"📚 Importing {title}")
+
+    urls = upload_media(db, manifest, media_dir, f"issues/{slugify(title)}", state, jobs)
+
+    stored = db.upsert_rows(Config.ISSUES_TABLE, [issue_row(manifest, urls)], 'import_key')
+    if not stored:
+        raise RuntimeError("Could not save the issue")
+    issue_id = stored[0]['id']
+    state.data['issue_id'] = issue_id
+    state.save()
+    print(f"✅ Issue saved (id {issue_id})")
+
+    for section, table, on_conflict in SECTIONS:
+        rows = section_rows(manifest, section, issue_id, base_dir, urls)
+        saved = skipped = 0
+        for chunk in chunked(rows, chunk_size):
+            digest = hashlib.sha256(json.dumps([table, chunk], sort_keys=True, default=str).encode()).hexdigest()
+            if state.chunk_done(digest):
+                skipped += len(chunk)
+                continue
+            if db.upsert_rows(table, chunk, on_conflict) is None:
+                raise RuntimeError(f"Could not save {section}")
+            state.data['chunks'].append(digest)
+            state.save()
+            saved += len(chunk)
+        print(f"✅ {section}: {saved} saved, {skipped} already imported")
+
+    print(f"🎉 Imported {title}")
+
+
+def export_archive(db, output_path, batch_size=500):
+    """Stream every table to NDJSON, one {"table", "row"} object per line"""
+    counts = {}
+    out = open_text(output_path, 'w')
+    try:
+        for table in EXPORT_TABLES:
+            counts[table] = 0
+            for row in db.iter_rows(table, batch_size):
+                out.write(json.dumps({'table': table, 'row': row}, ensure_ascii=False, default=str) + '\n')
+                counts[table] += 1
+            print(f"✅ {table}: {counts[table]} rows", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return counts
+
+
+def restore_archive(db, input_path, chunk_size=200):
+    """Upsert every row of an NDJSON export, matching rows on id"""
+    counts = {}
+    batch, batch_table = [], None
+
+    def flush():
+        if batch and db.upsert_rows(batch_table, batch, 'id') is None:
+            raise RuntimeError(f"Could not restore {batch_table}")
+        counts[batch_table] = counts.get(batch_table, 0) + len(batch)
+        batch.clear()
+
+    source = open_text(input_path, 'r')
+    try:
+        for line in source:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record['table'] != batch_table or len(batch) >= chunk_size:
+                if batch_table is not None:
+                    flush()
+                batch_table = record['table']
+            batch.append(record['row'])
+        if batch_table is not None:
+            flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    for table, count in counts.items():
+        print(f"✅ {table}: {count} rows")
+    print("ℹ️  Restored rows keep their ids; reset each table's id sequence before adding new rows")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export of magazine content")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="import an issue from a manifest")
+    import_parser.add_argument('manifest', help="YAML or JSON manifest file")
+    import_parser.add_argument('--media', help="media directory (default: the manifest's directory)")
+    import_parser.add_argument('--chunk-size', type=int, default=200, help="rows per upsert request")
+    import_parser.add_argument('--jobs', type=int, default=8, help="concurrent media uploads")
+
+    export_parser = commands.add_parser('export', help="export the archive to NDJSON")
+    export_parser.add_argument('output', help="output file (.gz to compress, - for stdout)")
+    export_parser.add_argument('--batch-size', type=int, default=500, help="rows fetched per request")
+
+    restore_parser = commands.add_parser('restore', help="restore an NDJSON export")
+    restore_parser.add_argument('input', help="input file (.gz if compressed, - for stdin)")
+    restore_parser.add_argument('--chunk-size', type=int, default=200, help="rows per upsert request")
+
+    args = parser.parse_args()
+
+    from database import get_db_service
+    db = get_db_service()
+    if not db:
+        print("❌ Database service not available", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == 'import':
+            import_issue(db, args.manifest, args.media, args.chunk_size, args.jobs)
+        elif args.command == 'export':
+            export_archive(db, args.output, args.batch_size)
+        else:
+            restore_archive(db, args.input, args.chunk_size)
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        if args.command == 'import':
+            print("💡 Fix the problem and run the same command again to resume", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
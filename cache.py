@@ -0,0 +1,291 @@
+"""
+In-process content cache with push-based invalidation.
+
+Database rows and rendered pages are cached until the underlying content
+changes. Changes arrive either from the database webhook (edits made in the
+Supabase dashboard) or from DatabaseService write methods; both call
+``content_cache.invalidate(table, record, authors=...)``, which purges exactly
+the entries derived from that row and hands the affected pages to the
+registered warmer so they are re-rendered in the background. Author pages
+are purged by the slugs the caller looked up in the author index
+(DatabaseService.get_credited_slugs).
+
+The cache lives in the worker process, and a change reaches only the worker
+that made it or received the webhook. With several workers, set
+CACHE_REDIS_URL (needs the redis package): every purge is then published to
+the other workers, which drop the same keys. Entries also expire after
+CACHE_TTL seconds, so a lost purge message (or a missing Redis) leaves a page
+stale for that long at most.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from authors import AUTHOR_SOURCES
+from config import Config
+
+PAGE_PREFIX = 'page:'
+
+_MISSING = object()
+
+
+def page_key(path: str) -> str:
+    """Cache key for a rendered page"""
+    return f"{PAGE_PREFIX}{path}"
+
+
+def keys_for_change(table: str, record: Optional[Dict[str, Any]] = None,
+                    old_record: Optional[Dict[str, Any]] = None,
+                    authors: Optional[Iterable[str]] = None) -> Optional[Set[str]]:
+    """Map a row change to the cache keys derived from that row.
+
+    authors are the slugs of the author pages that show the row. If they
+    are not known (None), a change to an issue or a credited row purges
+    every author page.
+
+    Returns None when the table is unknown, meaning everything should go.
+    """
+    rows = [row for row in (record, old_record) if row]
+    keys: Set[str] = set()
+
+    if table == Config.ISSUES_TABLE:
+        # Issue rows feed the issue list on the home and Mapao pages
+        keys.update({'issues', page_key('/'), page_key('/mapao')})
+        for row in rows:
+            if row.get('id') is not None:
+                keys.add(f"issue:{row['id']}")
+                keys.add(page_key(f"/issue/{row['id']}"))
+        if not rows:
+            return None
+    elif table in (Config.ARTICLES_TABLE, Config.CONTRIBUTORS_TABLE, Config.PHOTOS_TABLE):
+        for row in rows:
+            issue_id = row.get('issue_id')
+            if issue_id is None:
+                if table == Config.PHOTOS_TABLE:
+                    # Photos without an issue are the home page gallery (every page of it)
+                    keys.update({'gallery:*', page_key('/')})
+                continue
+            keys.add(f"issue:{issue_id}")
+            keys.add(page_key(f"/issue/{issue_id}"))
+            if table == Config.ARTICLES_TABLE:
+                # Article titles are listed on the home and Mapao pages
+                keys.update({page_key('/'), page_key('/mapao')})
+        if not keys:
+            return None
+    elif table == Config.MOMENTS_TABLE:
+        keys.update({'moments', page_key('/moments')})
+    elif table == 'awards':
+        keys.update({'awards', 'award_years', page_key('/awards')})
+        for row in rows:
+            if row.get('id') is not None:
+                keys.add(f"award:{row['id']}")
+                keys.add(page_key(f"/awards/{row['id']}"))
+    elif table == 'whos_who':
+        keys.update({'whos_who', 'whos_who_letters', page_key('/whos-who')})
+        for row in rows:
+            if row.get('id') is not None:
+                keys.add(f"whos_who:{row['id']}")
+                keys.add(page_key(f"/whos-who/{row['id']}"))
+    elif table == 'editorial_team':
+        keys.update({'team:research_wing', 'team:literary_wing', page_key('/about')})
+    elif table == 'authors':
+        for row in rows:
+            if row.get('slug'):
+                keys.add(f"author:{row['slug']}")
+                keys.add(page_key(f"/authors/{row['slug']}"))
+        if not keys:
+            return None
+    else:
+        return None
+
+    # Author pages list the issues the author appeared in and the rows that
+    # credit them
+    if table == Config.ISSUES_TABLE or table in AUTHOR_SOURCES:
+        if authors is None:
+            keys.update({'author:*', page_key('/authors/*')})
+        for slug in authors or ():
+            keys.add(f"author:{slug}")
+            keys.add(page_key(f"/authors/{slug}"))
+
+    return keys
+
+
+class ContentCache:
+    """Thread-safe key/value cache purged by content changes, with a TTL as a backstop"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self._entries: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._warmer: Optional[Callable[[List[str]], None]] = None
+        self._bus = None
+        self.ttl = ttl
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation, used to drop stale writes"""
+        return self._generation
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.monotonic():
+                self._entries.pop(key, None)
+                del self._expires[key]
+            return self._entries.get(key, default)
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> bool:
+        """Store a value unless an invalidation happened since ``generation``"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = value
+            if self.ttl:
+                self._expires[key] = time.monotonic() + self.ttl
+            return True
+
+    def fetch(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss.
+
+        Empty results are not stored, since DatabaseService returns empty
+        data when a query fails.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = loader()
+        if value:
+            self.set(key, value, generation=generation)
+        return value
+
+    def delete(self, keys: Iterable[str]) -> List[str]:
+        """Remove keys and return the ones that were present
+
+        A key ending in '*' removes every key starting with the part before it.
+        """
+        with self._lock:
+            self._generation += 1
+            removed = []
+            for key in keys:
+                if key.endswith('*'):
+                    matches = [entry for entry in self._entries if entry.startswith(key[:-1])]
+                else:
+                    matches = [key] if key in self._entries else []
+                for match in matches:
+                    del self._entries[match]
+                    self._expires.pop(match, None)
+                removed.extend(matches)
+            return removed
+
+    def clear(self) -> List[str]:
+        """Remove every entry and return the keys that were present"""
+        with self._lock:
+            self._generation += 1
+            keys = list(self._entries)
+            self._entries.clear()
+            self._expires.clear()
+            return keys
+
+    def set_warmer(self, warmer: Optional[Callable[[List[str]], None]]):
+        """Register the callback that re-renders purged pages"""
+        self._warmer = warmer
+
+    def set_bus(self, bus):
+        """Register the bus that carries purges to and from the other workers"""
+        self._bus = bus
+        if bus is not None:
+            bus.subscribe(self.apply_purge)
+
+    def apply_purge(self, keys: Optional[List[str]]):
+        """Drop the keys another worker purged (None means everything)
+
+        Pages are not re-rendered here: each worker renders its own copy on
+        the next visit, rather than every worker querying the database at once.
+        """
+        if keys is None:
+            self.clear()
+        else:
+            self.delete(keys)
+
+    def invalidate(self, table: str, record: Optional[Dict[str, Any]] = None,
+                   old_record: Optional[Dict[str, Any]] = None,
+                   authors: Optional[Iterable[str]] = None) -> List[str]:
+        """Purge the entries affected by a row change and re-warm its pages (see keys_for_change)"""
+        keys = keys_for_change(table, record, old_record, authors)
+        if keys is None:
+            purged = self.clear()
+            pages = [key[len(PAGE_PREFIX):] for key in purged if key.startswith(PAGE_PREFIX)]
+        else:
+            purged = self.delete(keys)
+            # Pages purged by a wildcard are left to render on their next visit
+            pages = [key[len(PAGE_PREFIX):] for key in keys if key.startswith(PAGE_PREFIX) and not key.endswith('*')]
+
+        if self._bus is not None:
+            try:
+                self._bus.publish(None if keys is None else sorted(keys))
+            except Exception as e:
+                # The other workers' copies expire after the TTL
+                print(f"Error publishing cache purge: {e}")
+
+        if pages and self._warmer:
+            try:
+                self._warmer(sorted(pages))
+            except Exception as e:
+                print(f"Error scheduling cache warm-up: {e}")
+        return sorted(purged)
+
+
+class RedisBus:
+    """Purge messages shared by every worker through Redis pub/sub"""
+
+    CHANNEL = 'content_cache:purge'
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._redis.ping()
+        # Skips this worker's own messages, which it has already applied
+        self._origin = uuid.uuid4().hex
+
+    def publish(self, keys: Optional[List[str]]):
+        self._redis.publish(self.CHANNEL, json.dumps({'origin': self._origin, 'keys': keys}))
+
+    def subscribe(self, callback: Callable[[Optional[List[str]]], None]):
+        """Call callback with the keys of every purge made by another worker"""
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.CHANNEL)
+
+        def listen():
+            while True:
+                try:
+                    for message in pubsub.listen():
+                        event = json.loads(message['data'])
+                        if event.get('origin') != self._origin:
+                            callback(event.get('keys'))
+                except Exception as e:
+                    # Reconnects on the next listen(); purges sent meanwhile
+                    # are covered by the TTL
+                    print(f"Cache purge listener error: {e}")
+                    time.sleep(1)
+
+        threading.Thread(target=listen, name='cache-purge-listener', daemon=True).start()
+
+
+def create_bus(redis_url: Optional[str] = None) -> Optional[RedisBus]:
+    """Share purges through Redis when configured and reachable"""
+    if redis_url:
+        try:
+            return RedisBus(redis_url)
+        except Exception as e:
+            print(f"Cache purge bus error: {e}")
+            print(f"Other workers will serve purged pages until they expire ({Config.CACHE_TTL} s).")
+    return None
+
+
+# Create a global instance
+content_cache = ContentCache(ttl=Config.CACHE_TTL)
@@ -0,0 +1,191 @@
+"""
+Response compression middleware.
+
+Compresses text responses (HTML, CSS, JS, JSON, XML, SVG) with brotli or gzip,
+whichever the client prefers in Accept-Encoding. Brotli is used only when the
+optional brotli package is installed. Streamed responses are compressed chunk
+by chunk: the first chunk (the page head) is flushed straight away, later ones
+only once flush_size bytes have built up, since every flush costs a few bytes
+and resets the compressor's block.
+"""
+
+import zlib
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'image/svg+xml',
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[name] = quality
+    return codings
+
+
+def negotiate_encoding(header: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Pick 'br' or 'gzip' for an Accept-Encoding header, or None for identity
+
+    Brotli wins ties. A client that sends 'identity;q=0' without accepting
+    either coding still gets gzip, unless it refuses gzip by name too.
+    """
+    codings = parse_accept_encoding(header or '')
+    wildcard = codings.get('*', 0.0)
+    candidates = (['br'] if brotli_available else []) + ['gzip']
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = codings.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    if best is None and codings.get('identity', 1.0) <= 0 and codings.get('gzip', 1.0) > 0:
+        return 'gzip'
+    return best
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 produces a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """WSGI middleware that compresses text responses"""
+
+    def __init__(self, app, min_size: int = 500, gzip_level: int = 6, brotli_quality: int = 5,
+                 flush_size: int = 4096):
+        self.app = app
+        self.min_size = min_size
+        self.flush_size = flush_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        state = {}
+
+        def compressing_start_response(status, headers, exc_info=None):
+            state['started'] = True
+            compressible = self._is_compressible(headers)
+            if compressible:
+                headers = self._add_vary(headers)
+            if encoding and compressible and self._should_compress(environ, status, headers):
+                headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+                headers = [(name, self._weak_etag(value) if name.lower() == 'etag' else value) for name, value in headers]
+                headers.append(('Content-Encoding', encoding))
+                state['stream'] = (_BrotliStream(self.brotli_quality) if encoding == 'br'
+                                   else _GzipStream(self.gzip_level))
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, compressing_start_response)
+        if state.get('started') and 'stream' not in state:
+            # Keep the original iterable so wsgi.file_wrapper still works
+            return app_iter
+        return self._compress(app_iter, state)
+
+    def _compress(self, app_iter, state):
+        # The stream is looked up per chunk because an app may call
+        # start_response only when its first chunk is produced
+        flushed = False
+        pending = 0
+        try:
+            for chunk in app_iter:
+                stream = state.get('stream')
+                if stream is None:
+                    yield chunk
+                elif chunk:
+                    data = stream.compress(chunk)
+                    pending += len(chunk)
+                    if not flushed or pending >= self.flush_size:
+                        data += stream.flush()
+                        flushed = True
+                        pending = 0
+                    if data:
+                        yield data
+            if state.get('stream') is not None:
+                yield state['stream'].finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    @staticmethod
+    def _header(headers, name):
+        name = name.lower()
+        return next((value for key, value in headers if key.lower() == name), None)
+
+    def _is_compressible(self, headers):
+        content_type = (self._header(headers, 'Content-Type') or '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _should_compress(self, environ, status, headers):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return False
+        if status[:3] in ('204', '206', '304') or int(status[:3]) < 200:
+            return False
+        if self._header(headers, 'Content-Encoding'):
+            return False
+        if 'no-transform' in (self._header(headers, 'Cache-Control') or '').lower():
+            return False
+        # Streamed responses have no Content-Length and are always compressed
+        length = self._header(headers, 'Content-Length')
+        return length is None or int(length) >= self.min_size
+
+    @staticmethod
+    def _add_vary(headers):
+        vary = CompressionMiddleware._header(headers, 'Vary')
+        if vary and 'accept-encoding' in vary.lower():
+            return headers
+        headers = [(name, value) for name, value in headers if name.lower() != 'vary']
+        headers.append(('Vary', f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'))
+        return headers
+
+    @staticmethod
+    def _weak_etag(value):
+        # The compressed body differs byte-for-byte from the original
+        return value if value.startswith('W/') else f"W/{value}"
@@ -10,6 +10,13 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL')
     SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
     
+    # Direct Postgres connection (used for migrations and the postgres backend)
+    DATABASE_URL = os.environ.get('DATABASE_URL')
+    
+    # Database backend: 'supabase' (HTTP API) or 'postgres' (pooled connections to DATABASE_URL)
+    DATABASE_BACKEND = (os.environ.get('DATABASE_BACKEND') or 'supabase').lower()
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE') or 5)
+    
     # Database table names
     ISSUES_TABLE = 'magazine_issues'
     ARTICLES_TABLE = 'articles'
@@ -17,6 +24,21 @@ class Config:
     CONTRIBUTORS_TABLE = 'contributors'
     MOMENTS_TABLE = 'moments'
     
+    # Site settings
+    SITE_URL = os.environ.get('SITE_URL') or 'https://www.fictionandpoetryclub.com'
+    
+    # Shared secret for the database change webhook (disabled when unset)
+    WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
+    
+    # Content cache: seconds an entry may be served before it is reloaded, in
+    # case a purge never reached this worker (0 keeps entries until purged)
+    CACHE_TTL = int(os.environ.get('CACHE_TTL') or 600)
+    # Send purges to every gunicorn worker (optional, needs the redis package)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('RATE_LIMIT_REDIS_URL')
+    
+    # Gallery images rendered with the home page; the carousel fetches the rest
+    GALLERY_PAGE_SIZE = 5
+    
     # File upload settings
     UPLOAD_FOLDER = 'static/uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
@@ -29,3 +51,20 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME') or 'mapaoliteraryjournal@gmail.com'
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'mapaoliteraryjournal@gmail.com'
+    
+    # Form rate limiting (/contact and /subscribe submissions)
+    # Buckets allow a burst of N submissions, refilled at M per minute
+    FORM_RATE_PER_IP_BURST = int(os.environ.get('FORM_RATE_PER_IP_BURST') or 5)
+    FORM_RATE_PER_IP_PER_MINUTE = float(os.environ.get('FORM_RATE_PER_IP_PER_MINUTE') or 2)
+    FORM_RATE_GLOBAL_BURST = int(os.environ.get('FORM_RATE_GLOBAL_BURST') or 30)
+    FORM_RATE_GLOBAL_PER_MINUTE = float(os.environ.get('FORM_RATE_GLOBAL_PER_MINUTE') or 30)
+    # Load shedding: concurrent submissions allowed, and max time spent queued before the app
+    FORM_MAX_IN_FLIGHT = int(os.environ.get('FORM_MAX_IN_FLIGHT') or 4)
+    FORM_MAX_QUEUE_MS = int(os.environ.get('FORM_MAX_QUEUE_MS') or 5000)
+    # Share limiter state across workers (optional, needs the redis package)
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL')
+    # Number of proxies in front of the app that append to X-Forwarded-For.
+    # Set 1 on Heroku; with 0 the header is ignored, since anyone can send it
+    PROXY_COUNT = int(os.environ.get('PROXY_COUNT') or 0)
+    # Bearer token for /metrics/limits (the endpoint is disabled when unset)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
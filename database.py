@@ -1,41 +1,122 @@
 from supabase import create_client, Client
 from config import Config
+from cache import content_cache
+from authors import AUTHOR_SOURCES, credited_values
+from models import Issue, Article, Contributor, Photo, Moment, Award, WhosWho, TeamMember, Author
+import base64
+import json
+import mimetypes
 import os
-from typing import List, Dict, Optional, Any
+import re
+from typing import Iterable, List, Dict, Optional, Any, Set
 from datetime import datetime
 import uuid
 
+# Typed date column each list is sorted by (added by migrations/001), and the
+# free-text column sorted by before it
+DATE_COLUMNS = {
+    Config.ISSUES_TABLE: ('release_on', 'release_date'),
+    Config.MOMENTS_TABLE: ('moment_on', 'date'),
+}
+
+def is_missing_date_column(error: Exception) -> bool:
+    """Whether a query failed because migrations/001 has not been applied to the database"""
+    message = str(error)
+    return (any(typed in message for typed, _ in DATE_COLUMNS.values())
+            and ('42703' in message or 'does not exist' in message))
+
+def is_missing_author_index(error: Exception) -> bool:
+    """Whether an author lookup failed because migrations/004 has not been applied to the database"""
+    message = str(error)
+    return (any(name in message for name in ('author_links', 'author_credits'))
+            and any(sign in message for sign in ('42883', '42P01', 'PGRST202', 'PGRST205',
+                                                 'does not exist', 'Could not find')))
+
+# The per-issue data get_issue_details returns, embedded by get_hydrated_issues
+ISSUE_DETAILS = ('featured_articles', 'contributors', 'gallery')
+
 class DatabaseService:
     def __init__(self):
         if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
             raise ValueError("Supabase credentials not configured. Please set SUPABASE_URL and SUPABASE_KEY environment variables.")
         
         self.supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        self.typed_dates = True
+        self.author_index = True
+        # Large text fields left out of list results are fetched through
+        # here; bound once so every model shares the same loader object
+        self.loader = self.load_fields
+    
+    # Date ordering
+    def _newest_first(self, query, table: str):
+        """Sort issues or moments newest first, undated last"""
+        typed, text = DATE_COLUMNS[table]
+        if self.typed_dates:
+            return query.order(typed, desc=True, nullsfirst=False).order('id', desc=True)
+        return query.order(text, desc=True).order('id', desc=True)
+    
+    def _with_date_fallback(self, run):
+        """Run a query sorted by date, falling back to the text date columns if migrations/001 is missing
+        
+        Without the fallback, the missing column would fail every list query
+        and the site would render empty.
+        """
+        if self.typed_dates:
+            try:
+                return run()
+            except Exception as e:
+                if not is_missing_date_column(e):
+                    raise
+                print("⚠️  Typed date columns are missing, sorting by the text dates. Run: python migrate.py")
+                self.typed_dates = False
+        return run()
     
     # Magazine Issues
-    def get_all_issues(self) -> List[Dict[str, Any]]:
-        """Get all magazine issues"""
-        try:
-            response = self.supabase.table(Config.ISSUES_TABLE).select('*').order('release_date', desc=True).execute()
-            return response.data
-        except Exception as e:
-            print(f"Error fetching issues: {e}")
-            return []
-    
-    def get_issues_by_type(self, journal_type: str) -> List[Dict[str, Any]]:
+    def get_all_issues(self) -> List[Issue]:
+        """Get all magazine issues
+        
+        Issues are loaded with their articles, contributors and photos in one
+        query where possible, and each issue's details are seeded into the
+        content cache as issue:<id> (what get_issue_details returns), so the
+        pages showing them need no further queries. The returned issues
+        carry no details themselves.
+        """
+        generation = content_cache.generation
+        issues = self.get_hydrated_issues()
+        if not issues:
+            try:
+                return self._all_issues()
+            except Exception as e:
+                print(f"Error fetching issues: {e}")
+                return []
+        for issue in issues:
+            details = {name: issue[name] for name in ISSUE_DETAILS}
+            for name in ISSUE_DETAILS:
+                del issue[name]
+            content_cache.set(f"issue:{issue.id}", details, generation=generation)
+        return issues
+    
+    def _all_issues(self) -> List[Issue]:
+        response = self._with_date_fallback(
+            lambda: self._newest_first(self.supabase.table(Config.ISSUES_TABLE).select('*'), Config.ISSUES_TABLE).execute())
+        return Issue.from_rows(response.data)
+    
+    def get_issues_by_type(self, journal_type: str) -> List[Issue]:
         """Get magazine issues by journal type (literary or research)"""
         try:
-            response = self.supabase.table(Config.ISSUES_TABLE).select('*').eq('journal_type', journal_type).order('release_date', desc=True).execute()
-            return response.data
+            response = self._with_date_fallback(
+                lambda: self._newest_first(self.supabase.table(Config.ISSUES_TABLE).select('*').eq('journal_type', journal_type),
+                                           Config.ISSUES_TABLE).execute())
+            return Issue.from_rows(response.data)
         except Exception as e:
             print(f"Error fetching {journal_type} issues: {e}")
             return []
     
-    def get_issue_by_id(self, issue_id: int) -> Optional[Dict[str, Any]]:
+    def get_issue_by_id(self, issue_id: int) -> Optional[Issue]:
         """Get a specific issue by ID"""
         try:
             response = self.supabase.table(Config.ISSUES_TABLE).select('*').eq('id', issue_id).single().execute()
-            return response.data
+            return Issue.from_row(response.data) if response.data else None
         except Exception as e:
             print(f"Error fetching issue {issue_id}: {e}")
             return None
@@ -44,6 +125,8 @@ class DatabaseService:
         """Create a new magazine issue"""
         try:
             response = self.supabase.table(Config.ISSUES_TABLE).insert(issue_data).execute()
+            if response.data:
+                self._invalidate(Config.ISSUES_TABLE, response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating issue: {e}")
@@ -53,6 +136,8 @@ class DatabaseService:
         """Update an existing issue"""
         try:
             response = self.supabase.table(Config.ISSUES_TABLE).update(issue_data).eq('id', issue_id).execute()
+            if response.data:
+                self._invalidate(Config.ISSUES_TABLE, {'id': issue_id})
             return bool(response.data)
         except Exception as e:
             print(f"Error updating issue {issue_id}: {e}")
@@ -61,27 +146,34 @@ class DatabaseService:
     def delete_issue(self, issue_id: int) -> bool:
         """Delete an issue"""
         try:
+            # Before the delete takes the issue's credits with it
+            authors = self.get_credited_slugs(Config.ISSUES_TABLE, [{'id': issue_id}])
             response = self.supabase.table(Config.ISSUES_TABLE).delete().eq('id', issue_id).execute()
+            if response.data:
+                content_cache.invalidate(Config.ISSUES_TABLE, {'id': issue_id}, authors=authors)
             return bool(response.data)
         except Exception as e:
             print(f"Error deleting issue {issue_id}: {e}")
             return False
     
     # Articles
-    def get_articles_by_issue(self, issue_id: int) -> List[Dict[str, Any]]:
-        """Get all articles for a specific issue"""
+    def get_articles_by_issue(self, issue_id: int) -> List[Article]:
+        """Get all articles for a specific issue (content is loaded on first access)"""
         try:
-            response = self.supabase.table(Config.ARTICLES_TABLE).select('*').eq('issue_id', issue_id).order('created_at', desc=True).execute()
-            return response.data
+            return self._articles_by_issue(issue_id)
         except Exception as e:
             print(f"Error fetching articles for issue {issue_id}: {e}")
             return []
     
-    def get_article_by_id(self, article_id: int) -> Optional[Dict[str, Any]]:
+    def _articles_by_issue(self, issue_id: int) -> List[Article]:
+        response = self.supabase.table(Config.ARTICLES_TABLE).select('*').eq('issue_id', issue_id).order('created_at', desc=True).execute()
+        return Article.from_rows(response.data, defer=True, loader=self.loader)
+    
+    def get_article_by_id(self, article_id: int) -> Optional[Article]:
         """Get a specific article by ID"""
         try:
             response = self.supabase.table(Config.ARTICLES_TABLE).select('*').eq('id', article_id).single().execute()
-            return response.data
+            return Article.from_row(response.data) if response.data else None
         except Exception as e:
             print(f"Error fetching article {article_id}: {e}")
             return None
@@ -90,41 +182,70 @@ class DatabaseService:
         """Create a new article"""
         try:
             response = self.supabase.table(Config.ARTICLES_TABLE).insert(article_data).execute()
+            if response.data:
+                self._invalidate(Config.ARTICLES_TABLE, response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating article: {e}")
             return None
     
     # Photos
-    def get_photos_by_issue(self, issue_id: int) -> List[Dict[str, Any]]:
+    def get_photos_by_issue(self, issue_id: int) -> List[Photo]:
         """Get all photos for a specific issue"""
         try:
-            response = self.supabase.table(Config.PHOTOS_TABLE).select('*').eq('issue_id', issue_id).order('created_at', desc=True).execute()
-            return response.data
+            return self._photos_by_issue(issue_id)
         except Exception as e:
             print(f"Error fetching photos for issue {issue_id}: {e}")
             return []
     
+    def _photos_by_issue(self, issue_id: int) -> List[Photo]:
+        response = self.supabase.table(Config.PHOTOS_TABLE).select('*').eq('issue_id', issue_id).order('created_at', desc=True).execute()
+        return Photo.from_rows(response.data)
+    
     def get_gallery_images(self) -> List[Dict[str, Any]]:
         """Get all gallery images for carousel display"""
         try:
-            response = self.supabase.table(Config.PHOTOS_TABLE).select('*').is_('issue_id', 'null').order('created_at', desc=True).execute()
-            # Map the database columns to expected carousel format
-            gallery_images = []
-            for photo in response.data:
-                gallery_images.append({
-                    'photo_url': photo.get('file_url'),  # Map file_url to photo_url for carousel
-                    'caption': photo.get('caption'),
-                    'description': photo.get('alt_text'),  # Map alt_text to description for carousel
-                    'filename': photo.get('filename'),
-                    'id': photo.get('id'),
-                    'created_at': photo.get('created_at')
-                })
-            return gallery_images
+            response = self.supabase.table(Config.PHOTOS_TABLE).select('*').is_('issue_id', 'null').order('created_at', desc=True).order('id', desc=True).execute()
+            return [self._gallery_image(photo) for photo in response.data]
         except Exception as e:
             print(f"Error fetching gallery images: {e}")
             return []
     
+    def get_gallery_page(self, limit: int, cursor: str = None) -> Optional[Dict[str, Any]]:
+        """Get one page of gallery images, newest first, starting after cursor
+        
+        Uses keyset pagination on (created_at, id), so every page costs the same
+        however deep into the gallery it is. Returns the images and the cursor
+        for the next page (None on the last page).
+        """
+        try:
+            query = self.supabase.table(Config.PHOTOS_TABLE).select('id, file_url, filename, caption, alt_text, created_at').is_('issue_id', 'null')
+            if cursor:
+                created_at, photo_id = decode_cursor(cursor)
+                query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{photo_id})')
+            # Fetch one extra row to learn whether another page exists
+            response = query.order('created_at', desc=True).order('id', desc=True).limit(limit + 1).execute()
+            photos = response.data[:limit]
+            next_cursor = None
+            if len(response.data) > limit:
+                next_cursor = encode_cursor(photos[-1]['created_at'], photos[-1]['id'])
+            return {'images': [self._gallery_image(photo) for photo in photos], 'next_cursor': next_cursor}
+        except Exception as e:
+            print(f"Error fetching gallery page: {e}")
+            return None
+    
+    @staticmethod
+    def _gallery_image(photo: Dict[str, Any]) -> Dict[str, Any]:
+        """Map the database columns to expected carousel format"""
+        return {
+            'photo_url': photo.get('file_url'),  # Map file_url to photo_url for carousel
+            'caption': photo.get('caption'),
+            'description': photo.get('alt_text'),  # Map alt_text to description for carousel
+            'filename': photo.get('filename'),
+            'id': photo.get('id'),
+            'created_at': photo.get('created_at')
+        }
+    
     def add_gallery_image(self, file_url: str, filename: str, caption: str = None, alt_text: str = None) -> Optional[Dict[str, Any]]:
         """Add a new gallery image to the carousel"""
         try:
@@ -136,6 +257,8 @@ class DatabaseService:
                 'issue_id': None  # Gallery images are not tied to specific issues
             }
             response = self.supabase.table(Config.PHOTOS_TABLE).insert(photo_data).execute()
+            if response.data:
+                self._invalidate(Config.PHOTOS_TABLE, response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error adding gallery image: {e}")
@@ -154,6 +277,8 @@ class DatabaseService:
                 return False
                 
             response = self.supabase.table(Config.PHOTOS_TABLE).update(update_data).eq('file_url', file_url).is_('issue_id', 'null').execute()
+            if response.data:
+                self._invalidate(Config.PHOTOS_TABLE, {'issue_id': None})
             return len(response.data) > 0
         except Exception as e:
             print(f"Error updating gallery image: {e}")
@@ -163,6 +288,8 @@ class DatabaseService:
         """Delete a gallery image"""
         try:
             response = self.supabase.table(Config.PHOTOS_TABLE).delete().eq('file_url', file_url).is_('issue_id', 'null').execute()
+            if response.data:
+                self._invalidate(Config.PHOTOS_TABLE, {'issue_id': None})
             return len(response.data) > 0
         except Exception as e:
             print(f"Error deleting gallery image: {e}")
@@ -172,39 +299,96 @@ class DatabaseService:
         """Upload a new photo"""
         try:
             response = self.supabase.table(Config.PHOTOS_TABLE).insert(photo_data).execute()
+            if response.data:
+                self._invalidate(Config.PHOTOS_TABLE, response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error uploading photo: {e}")
             return None
     
     # Contributors
-    def get_contributors_by_issue(self, issue_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    def get_contributors_by_issue(self, issue_id: int) -> Dict[str, List[Contributor]]:
         """Get all contributors for a specific issue"""
         try:
-            response = self.supabase.table(Config.CONTRIBUTORS_TABLE).select('*').eq('issue_id', issue_id).execute()
-            
-            contributors = {
-                'editorial_team': [],
-                'featured_writers': [],
-                'photographers': []
-            }
-            
-            for contributor in response.data:
-                role_type = contributor.get('role_type', 'featured_writers')
-                if role_type in contributors:
-                    contributors[role_type].append(contributor)
-            
-            return contributors
+            return self._contributors_by_issue(issue_id)
         except Exception as e:
             print(f"Error fetching contributors for issue {issue_id}: {e}")
             return {'editorial_team': [], 'featured_writers': [], 'photographers': []}
     
+    def _contributors_by_issue(self, issue_id: int) -> Dict[str, List[Contributor]]:
+        response = self.supabase.table(Config.CONTRIBUTORS_TABLE).select('*').eq('issue_id', issue_id).order('id').execute()
+        return self._group_contributors(response.data)
+    
+    def _group_contributors(self, rows: List[Dict[str, Any]]) -> Dict[str, List[Contributor]]:
+        """Sort contributor rows into the sections of the issue page"""
+        contributors = {
+            'editorial_team': [],
+            'featured_writers': [],
+            'photographers': []
+        }
+        
+        for contributor in rows:
+            role_type = contributor.get('role_type', 'featured_writers')
+            if role_type in contributors:
+                contributors[role_type].append(Contributor.from_row(contributor, defer=True, loader=self.loader))
+        
+        return contributors
+    
+    # Issue details
+    def get_issue_details(self, issue_id: int) -> Optional[Dict[str, Any]]:
+        """Get the articles, contributors, and photos belonging to an issue (None if any query fails)
+        
+        The per-table getters return empty data when a query fails, which
+        cannot be told apart from an issue that has none. This returns None
+        instead, so a failed fetch is never cached as the issue's content.
+        """
+        try:
+            return {
+                'featured_articles': self._articles_by_issue(issue_id),
+                'contributors': self._contributors_by_issue(issue_id),
+                'gallery': self._photos_by_issue(issue_id)
+            }
+        except Exception as e:
+            print(f"Error fetching details for issue {issue_id}: {e}")
+            return None
+    
+    # Hydrated issues
+    def get_hydrated_issues(self) -> List[Issue]:
+        """Get all issues with their articles, contributors, and photos in one request
+        
+        Each issue carries featured_articles, contributors and gallery, the same
+        data the per-issue getters return.
+        """
+        try:
+            response = self._with_date_fallback(lambda: (
+                self._newest_first(self.supabase.table(Config.ISSUES_TABLE)
+                                   .select(f'*, featured_articles:{Config.ARTICLES_TABLE}(*), '
+                                           f'contributors:{Config.CONTRIBUTORS_TABLE}(*), gallery:{Config.PHOTOS_TABLE}(*)'),
+                                   Config.ISSUES_TABLE)
+                .order('created_at', desc=True, foreign_table='featured_articles')
+                .order('id', foreign_table='contributors')
+                .order('created_at', desc=True, foreign_table='gallery')
+                .execute()))
+            return [self._hydrate_issue(row) for row in response.data]
+        except Exception as e:
+            print(f"Error fetching hydrated issues: {e}")
+            return []
+    
+    def _hydrate_issue(self, row: Dict[str, Any]) -> Issue:
+        """Build an Issue from a row with its articles, contributors and photos embedded"""
+        row = dict(row)
+        row['featured_articles'] = Article.from_rows(row.get('featured_articles') or [], defer=True, loader=self.loader)
+        row['contributors'] = self._group_contributors(row.get('contributors') or [])
+        row['gallery'] = Photo.from_rows(row.get('gallery') or [])
+        return Issue.from_row(row)
+    
     # Moments
-    def get_all_moments(self) -> List[Dict[str, Any]]:
+    def get_all_moments(self) -> List[Moment]:
         """Get all moments and milestones"""
         try:
-            response = self.supabase.table(Config.MOMENTS_TABLE).select('*').order('date', desc=True).execute()
-            return response.data
+            response = self._with_date_fallback(
+                lambda: self._newest_first(self.supabase.table(Config.MOMENTS_TABLE).select('*'), Config.MOMENTS_TABLE).execute())
+            return Moment.from_rows(response.data)
         except Exception as e:
             print(f"Error fetching moments: {e}")
             return []
@@ -213,6 +397,8 @@ class DatabaseService:
         """Create a new moment"""
         try:
             response = self.supabase.table(Config.MOMENTS_TABLE).insert(moment_data).execute()
+            if response.data:
+                self._invalidate(Config.MOMENTS_TABLE, response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating moment: {e}")
@@ -244,14 +430,14 @@ class DatabaseService:
             return False
     
     # Editorial Team
-    def get_editorial_team(self, team_type: str = None) -> List[Dict[str, Any]]:
+    def get_editorial_team(self, team_type: str = None) -> List[TeamMember]:
         """Get editorial team members"""
         try:
             query = self.supabase.table('editorial_team').select('*')
             if team_type:
                 query = query.eq('team_type', team_type)
             response = query.order('display_order', desc=False).execute()
-            return response.data
+            return TeamMember.from_rows(response.data)
         except Exception as e:
             print(f"Error fetching editorial team: {e}")
             return []
@@ -260,35 +446,37 @@ class DatabaseService:
         """Create a new team member"""
         try:
             response = self.supabase.table('editorial_team').insert(member_data).execute()
+            if response.data:
+                self._invalidate('editorial_team', response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating team member: {e}")
             return None
     
     # Awards
-    def get_all_awards(self) -> List[Dict[str, Any]]:
+    def get_all_awards(self) -> List[Award]:
         """Get all awards ordered by year (descending)"""
         try:
             response = self.supabase.table('awards').select('*').order('year', desc=True).execute()
-            return response.data
+            return Award.from_rows(response.data, defer=True, loader=self.loader)
         except Exception as e:
             print(f"Error fetching awards: {e}")
             return []
     
-    def get_awards_by_year(self, year: int) -> List[Dict[str, Any]]:
+    def get_awards_by_year(self, year: int) -> List[Award]:
         """Get awards for a specific year"""
         try:
             response = self.supabase.table('awards').select('*').eq('year', year).execute()
-            return response.data
+            return Award.from_rows(response.data, defer=True, loader=self.loader)
         except Exception as e:
             print(f"Error fetching awards for year {year}: {e}")
             return []
     
-    def get_award_by_id(self, award_id: int) -> Optional[Dict[str, Any]]:
+    def get_award_by_id(self, award_id: int) -> Optional[Award]:
         """Get a specific award by ID"""
         try:
             response = self.supabase.table('awards').select('*').eq('id', award_id).single().execute()
-            return response.data
+            return Award.from_row(response.data) if response.data else None
         except Exception as e:
             print(f"Error fetching award {award_id}: {e}")
             return None
@@ -307,35 +495,37 @@ class DatabaseService:
         """Create a new award"""
         try:
             response = self.supabase.table('awards').insert(award_data).execute()
+            if response.data:
+                self._invalidate('awards', response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating award: {e}")
             return None
     
     # Who's Who
-    def get_all_whos_who(self) -> List[Dict[str, Any]]:
-        """Get all who's who entries ordered by name"""
+    def get_all_whos_who(self) -> List[WhosWho]:
+        """Get all who's who entries ordered by name (bios shortened to a preview)"""
         try:
             response = self.supabase.table('whos_who').select('*').order('name').execute()
-            return response.data
+            return WhosWho.from_rows(response.data, defer=True, loader=self.loader)
         except Exception as e:
             print(f"Error fetching who's who: {e}")
             return []
     
-    def get_whos_who_by_letter(self, letter: str) -> List[Dict[str, Any]]:
+    def get_whos_who_by_letter(self, letter: str) -> List[WhosWho]:
         """Get who's who entries starting with a specific letter"""
         try:
             response = self.supabase.table('whos_who').select('*').ilike('name', f'{letter}%').order('name').execute()
-            return response.data
+            return WhosWho.from_rows(response.data, defer=True, loader=self.loader)
         except Exception as e:
             print(f"Error fetching who's who for letter {letter}: {e}")
             return []
     
-    def get_whos_who_by_id(self, person_id: int) -> Optional[Dict[str, Any]]:
+    def get_whos_who_by_id(self, person_id: int) -> Optional[WhosWho]:
         """Get a specific who's who entry by ID"""
         try:
             response = self.supabase.table('whos_who').select('*').eq('id', person_id).single().execute()
-            return response.data
+            return WhosWho.from_row(response.data) if response.data else None
         except Exception as e:
             print(f"Error fetching who's who entry {person_id}: {e}")
             return None
@@ -354,20 +544,264 @@ class DatabaseService:
         """Create a new who's who entry"""
         try:
             response = self.supabase.table('whos_who').insert(person_data).execute()
+            if response.data:
+                self._invalidate('whos_who', response.data[0])
             return response.data[0] if response.data else None
         except Exception as e:
             print(f"Error creating who's who entry: {e}")
             return None
 
+    # Authors
+    def get_author_links(self, values: List[str], split: bool = False) -> Optional[List[Dict[str, str]]]:
+        """The people each name value credits, with their author slugs (None on failure)
+        
+        Bylines are split into their names when split is set. Rows are
+        {'value', 'name', 'slug'} in the order of values; the slug is '' for
+        a name with nothing left once normalized.
+        """
+        if not values:
+            return []
+        try:
+            return self._with_author_index(lambda: self._author_links(values, split), [])
+        except Exception as e:
+            print(f"Error looking up author links: {e}")
+            return None
+    
+    def _author_links(self, values: List[str], split: bool) -> List[Dict[str, str]]:
+        return self.supabase.rpc('author_links', {'names': list(values), 'split': split}).execute().data
+    
+    def get_credited_slugs(self, table: str, rows: Iterable[Optional[Dict[str, Any]]]) -> Optional[Set[str]]:
+        """Slugs of the author pages that show any of rows of table (None if they could not be looked up)
+        
+        For issues, the authors credited in them. For articles, contributors,
+        awards and Who's Who, the authors the index credits to the rows plus
+        those their names credit, which covers deleted rows and the old name
+        in a webhook's old_record.
+        """
+        rows = [row for row in rows if row]
+        if table != Config.ISSUES_TABLE and table not in AUTHOR_SOURCES:
+            return set()
+        
+        def run():
+            ids = sorted({row['id'] for row in rows if row.get('id') is not None})
+            if table == Config.ISSUES_TABLE:
+                return self._indexed_slugs(None, ids) if ids else set()
+            slugs = self._indexed_slugs(table, ids) if ids else set()
+            values, split = credited_values(table, rows)
+            if values:
+                slugs.update(link['slug'] for link in self._author_links(values, split) if link['slug'])
+            return slugs
+        try:
+            return self._with_author_index(run, None)
+        except Exception as e:
+            print(f"Error looking up the authors of {table} rows: {e}")
+            return None
+    
+    def _with_author_index(self, run, missing):
+        """Run an author index query, returning missing instead if migrations/004 is not applied
+        
+        Like _with_date_fallback, the missing index is noticed once; after
+        that names are shown without links and pages crediting them are
+        cached as usual instead of failing the lookup on every view.
+        """
+        if self.author_index:
+            try:
+                return run()
+            except Exception as e:
+                if not is_missing_author_index(e):
+                    raise
+                print("⚠️  Author index is missing, showing names without links. Run: python migrate.py")
+                self.author_index = False
+        return missing
+    
+    def _indexed_slugs(self, source_table: Optional[str], ids: List[int]) -> Set[str]:
+        """Slugs the author index credits to rows of source_table, or to the issues if it is None"""
+        query = self.supabase.table('author_credits').select('authors(slug)')
+        if source_table is None:
+            query = query.in_('issue_id', ids)
+        else:
+            query = query.eq('source_table', source_table).in_('source_id', ids)
+        return {row['authors']['slug'] for row in query.execute().data if row.get('authors')}
+    
+    def _invalidate(self, table: str, row: Dict[str, Any]):
+        """Purge the cache entries built from a changed row, with the pages of the authors it credits"""
+        content_cache.invalidate(table, row, authors=self.get_credited_slugs(table, [row]))
+    
+    def get_author_by_slug(self, slug: str) -> Optional[Author]:
+        """Get an author with the articles, contributions, awards and Who's Who entry credited to them
+        
+        Reads the author index kept by migration 004, fetching each kind of
+        credited row by id rather than scanning the issues.
+        """
+        try:
+            response = self.supabase.table('authors').select('*, author_credits(source_table, source_id, issue_id)').eq('slug', slug).execute()
+            if not response.data:
+                return None
+            row = dict(response.data[0])
+            credits = row.pop('author_credits') or []
+            ids = {}
+            for credit in credits:
+                ids.setdefault(credit['source_table'], []).append(credit['source_id'])
+            issue_ids = list({credit['issue_id'] for credit in credits if credit.get('issue_id') is not None})
+            
+            def rows_by_id(table, *order):
+                if not ids.get(table):
+                    return []
+                query = self.supabase.table(table).select('*').in_('id', ids[table])
+                for column, desc in order:
+                    query = query.order(column, desc=desc)
+                return query.execute().data
+            
+            row['articles'] = rows_by_id(Config.ARTICLES_TABLE, ('created_at', True), ('id', True))
+            row['contributors'] = rows_by_id(Config.CONTRIBUTORS_TABLE, ('id', False))
+            row['awards'] = rows_by_id('awards', ('year', True), ('id', True))
+            row['whos_who'] = rows_by_id('whos_who', ('id', False))
+            row['issues'] = []
+            if issue_ids:
+                row['issues'] = self._with_date_fallback(
+                    lambda: self._newest_first(self.supabase.table(Config.ISSUES_TABLE).select('*').in_('id', issue_ids),
+                                               Config.ISSUES_TABLE).execute().data)
+            return self._build_author(row)
+        except Exception as e:
+            print(f"Error fetching author {slug}: {e}")
+            return None
+    
+    def _build_author(self, row: Dict[str, Any]) -> Author:
+        """Build an Author from its row and the rows credited to it, grouping articles and contributions by issue"""
+        row = dict(row)
+        articles = Article.from_rows(row.pop('articles', None) or [], defer=True, loader=self.loader)
+        contributors = row.pop('contributors', None) or []
+        issues = []
+        for issue in row.pop('issues', None) or []:
+            # The editorial is not shown on author pages
+            issue = dict(issue, editorial=None)
+            issue['featured_articles'] = [article for article in articles if article.issue_id == issue['id']]
+            issue['contributors'] = self._group_contributors([contributor for contributor in contributors
+                                                              if contributor.get('issue_id') == issue['id']])
+            issues.append(Issue.from_row(issue))
+        row['issues'] = issues
+        row['awards'] = Award.from_rows(row.pop('awards', None) or [], defer=True, loader=self.loader)
+        people = WhosWho.from_rows(row.pop('whos_who', None) or [], defer=True, loader=self.loader)
+        row['profile'] = people[0] if people else None
+        return Author.from_row(row)
+    
+    def upload_media(self, file_path: str, storage_path: str, bucket_name: str = 'magazine-assets') -> Optional[str]:
+        """Upload a file to Supabase Storage under storage_path, replacing any existing copy"""
+        try:
+            content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+            with open(file_path, 'rb') as f:
+                self.supabase.storage.from_(bucket_name).upload(
+                    path=storage_path,
+                    file=f.read(),
+                    file_options={"content-type": content_type, "upsert": "true"}
+                )
+            return self.supabase.storage.from_(bucket_name).get_public_url(storage_path)
+        except Exception as e:
+            print(f"Error uploading file {file_path}: {e}")
+            return None
+    
+    # Bulk operations
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]], on_conflict: str) -> Optional[List[Dict[str, Any]]]:
+        """Insert or update a batch of rows in one request, matching existing rows on on_conflict"""
+        try:
+            authors = self._credited_before_upsert(table, rows)
+            response = self.supabase.table(table).upsert(rows, on_conflict=on_conflict).execute()
+            self._invalidate_rows(table, response.data, authors)
+            return response.data
+        except Exception as e:
+            print(f"Error upserting {len(rows)} rows into {table}: {e}")
+            return None
+    
+    def _credited_before_upsert(self, table: str, rows: List[Dict[str, Any]]) -> Optional[Set[str]]:
+        """Authors credited by the rows an upsert may overwrite, whose pages change if a name does"""
+        if table not in AUTHOR_SOURCES:
+            return set()
+        by_id = self.get_credited_slugs(table, [{'id': row['id']} for row in rows if row.get('id') is not None])
+        # Rows matched on a natural key have no id yet: take every author of their issues
+        by_issue = self.get_credited_slugs(Config.ISSUES_TABLE, [{'id': row['issue_id']} for row in rows
+                                                                  if row.get('issue_id') is not None])
+        if by_id is None or by_issue is None:
+            return None
+        return by_id | by_issue
+    
+    def _invalidate_rows(self, table: str, rows: List[Dict[str, Any]], authors_before: Optional[Set[str]]):
+        """Purge the cache for a batch of changed rows, once per issue (or row) rather than per row"""
+        authors = self.get_credited_slugs(table, rows)
+        authors = None if authors is None or authors_before is None else authors | authors_before
+        seen = set()
+        for row in rows:
+            marker = row.get('issue_id') if 'issue_id' in row else ('id', row.get('id'))
+            if marker not in seen:
+                # Every author page of the batch goes with the first purge
+                content_cache.invalidate(table, row, authors=authors if not seen else set())
+                seen.add(marker)
+    
+    def iter_rows(self, table: str, batch_size: int = 500):
+        """Yield every row of a table in id order, fetching one batch at a time"""
+        last_id = None
+        while True:
+            query = self.supabase.table(table).select('*').order('id').limit(batch_size)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.execute().data
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+    
+    # Deferred fields
+    def load_fields(self, table: str, ids: List[Any], fields: List[str], batch_size: int = 200) -> Optional[List[Dict[str, Any]]]:
+        """Get some columns of many rows by id, a batch of ids per request (None on failure)"""
+        try:
+            rows = []
+            for start in range(0, len(ids), batch_size):
+                response = self.supabase.table(table).select(', '.join(['id', *fields])).in_('id', ids[start:start + batch_size]).execute()
+                rows.extend(response.data)
+            return rows
+        except Exception as e:
+            print(f"Error fetching {', '.join(fields)} from {table}: {e}")
+            return None
+    
+    # Change tracking
+    def get_row_stamps(self, table: str, columns: str = 'id, updated_at') -> Optional[List[Dict[str, Any]]]:
+        """Get the update timestamp of every row in a table (None if unavailable)"""
+        try:
+            response = self.supabase.table(table).select(columns).execute()
+            return response.data
+        except Exception as e:
+            print(f"Error fetching change stamps for {table}: {e}")
+            return None
+
+def encode_cursor(created_at: str, photo_id: int) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    raw = json.dumps([created_at, photo_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    """Decode a cursor from encode_cursor, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, photo_id = json.loads(raw)
+        # Validate before the values are placed in a query filter
+        if not re.match(r'^[0-9T:.+\- ]+$', created_at):
+            raise ValueError(created_at)
+        return created_at, int(photo_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
 # Create a global instance
 db_service = None
 
 def get_db_service() -> DatabaseService:
-    """Get or create the database service instance"""
+    """Get or create the database service instance for the configured backend"""
     global db_service
     if db_service is None:
         try:
-            db_service = DatabaseService()
+            if Config.DATABASE_BACKEND == 'postgres':
+                from postgres_database import PostgresDatabaseService
+                db_service = PostgresDatabaseService()
+            else:
+                db_service = DatabaseService()
         except ValueError as e:
             print(f"Database service not available: {e}")
             return None
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Export the public site to static HTML
+
+Renders every public page to an output directory that can be deployed to any
+static host. Only /contact, /subscribe and /api/gallery (the later pages of
+the home page carousel) stay dynamic and must be routed to the Flask app.
+Pages are rendered in parallel worker processes, and later runs only
+re-render pages whose content changed (by updated_at) since the last export.
+
+Usage:
+    python freeze.py                   # incremental export to ./build
+    python freeze.py --full            # re-render every page
+    python freeze.py -o dist -w 8      # custom output directory and worker count
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_NAME = '.freeze-manifest.json'
+
+# Files served from the site root by app.py
+ROOT_FILES = ['favicon.ico', 'robots.txt', 'sitemap.xml']
+
+
+def stamp(rows):
+    """Summarise rows as 'latest updated_at|row count' so edits and deletions both change it"""
+    if rows is None:
+        return None
+    latest = max((row.get('updated_at') or '' for row in rows), default='')
+    return f"{latest}|{len(rows)}"
+
+
+def collect_pages(db):
+    """Map every public page path to a stamp of the content it is built from.
+
+    A stamp of None means the content could not be checked and the page is
+    always re-rendered.
+    """
+    issues = db.get_row_stamps(Config.ISSUES_TABLE)
+    articles = db.get_row_stamps(Config.ARTICLES_TABLE, 'id, issue_id, updated_at')
+    contributors = db.get_row_stamps(Config.CONTRIBUTORS_TABLE, 'id, issue_id, updated_at')
+    photos = db.get_row_stamps(Config.PHOTOS_TABLE, 'id, issue_id, updated_at')
+    moments = db.get_row_stamps(Config.MOMENTS_TABLE)
+    awards = db.get_row_stamps('awards')
+    people = db.get_row_stamps('whos_who')
+    team = db.get_row_stamps('editorial_team')
+    authors = db.get_row_stamps('authors', 'id, slug, updated_at')
+
+    def combine(*parts):
+        return None if any(part is None for part in parts) else '/'.join(parts)
+
+    gallery = None if photos is None else [photo for photo in photos if photo.get('issue_id') is None]
+
+    pages = {
+        '/': combine(stamp(issues), stamp(articles), stamp(gallery)),
+        '/mapao': combine(stamp(issues), stamp(articles)),
+        '/moments': stamp(moments),
+        '/about': stamp(team),
+        '/awards': stamp(awards),
+        '/whos-who': stamp(people),
+    }
+
+    for issue in issues or []:
+        issue_id = issue['id']
+        related = [
+            [row for row in rows if row.get('issue_id') == issue_id] if rows is not None else None
+            for rows in (articles, contributors, photos)
+        ]
+        pages[f"/issue/{issue_id}"] = combine(stamp([issue]), *(stamp(rows) for rows in related))
+
+    for award in awards or []:
+        pages[f"/awards/{award['id']}"] = stamp([award])
+
+    for person in people or []:
+        pages[f"/whos-who/{person['id']}"] = stamp([person])
+
+    # An author's updated_at moves whenever a row crediting them changes;
+    # their pages also show issue titles
+    for author in authors or []:
+        pages[f"/authors/{author['slug']}"] = combine(stamp([author]), stamp(issues))
+
+    return pages
+
+
+def app_modules(name='app', found=None):
+    """Paths of app.py and every module of this project it imports, directly or not
+
+    Imports inside functions count too (get_db_service imports the Postgres
+    backend only when it is configured).
+    """
+    found = set() if found is None else found
+    path = os.path.join(BASE_DIR, f"{name}.py")
+    if path in found or not os.path.exists(path):
+        return found
+    found.add(path)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for module in names:
+            app_modules(module.split('.')[0], found)
+    return found
+
+
+def build_fingerprint():
+    """Hash the code and templates that every page depends on"""
+    digest = hashlib.sha256()
+    paths = sorted(app_modules())
+    templates_dir = os.path.join(BASE_DIR, 'templates')
+    for root, _, files in os.walk(templates_dir):
+        paths.extend(os.path.join(root, name) for name in files)
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, BASE_DIR).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def output_file(output_dir, path):
+    """Where a page path is written: /issue/3 -> issue/3/index.html"""
+    return os.path.join(output_dir, path.strip('/'), 'index.html')
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+# Worker process state
+_client = None
+
+
+def _init_worker():
+    """Import the app once per worker process"""
+    global _client
+    from app import app
+    _client = app.test_client(use_cookies=False)
+
+
+def _render_page(job):
+    """Render one page in a worker and write it to disk"""
+    path, output_dir = job
+    try:
+        response = _client.get(path, base_url=Config.SITE_URL)
+        if response.status_code != 200:
+            return path, f"HTTP {response.status_code}"
+        target = output_file(output_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(response.data)
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+def copy_static(output_dir):
+    """Copy static assets, skipping files that are already up to date"""
+    static_dir = os.path.join(BASE_DIR, 'static')
+    copies = []
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            source = os.path.join(root, name)
+            copies.append((source, os.path.join(output_dir, 'static', os.path.relpath(source, static_dir))))
+    copies.extend((os.path.join(static_dir, name), os.path.join(output_dir, name)) for name in ROOT_FILES)
+
+    copied = 0
+    for source, target in copies:
+        if not os.path.exists(source):
+            continue
+        if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(source, target)
+        copied += 1
+    return copied
+
+
+def remove_page(output_dir, path):
+    """Delete a page that no longer exists, along with its empty directory"""
+    target = output_file(output_dir, path)
+    if os.path.exists(target):
+        os.remove(target)
+        directory = os.path.dirname(target)
+        if directory != output_dir and not os.listdir(directory):
+            os.rmdir(directory)
+
+
+def freeze(output_dir, workers=None, full=False):
+    """Export the site, returning the number of failed pages"""
+    from database import get_db_service
+
+    db = get_db_service()
+    if not db:
+        print("❌ Database service not available - cannot export the site")
+        return 1
+
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    pages = collect_pages(db)
+    fingerprint = build_fingerprint()
+    manifest = load_manifest(output_dir)
+    previous = manifest.get('pages', {})
+    if full or manifest.get('fingerprint') != fingerprint:
+        previous = {}
+
+    changed = [
+        path for path, version in sorted(pages.items())
+        if version is None or previous.get(path) != version
+        or not os.path.exists(output_file(output_dir, path))
+    ]
+    removed = [path for path in manifest.get('pages', {}) if path not in pages]
+
+    print(f"📄 {len(pages)} pages, {len(changed)} to render, {len(removed)} to remove")
+
+    failed = {}
+    if changed:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+            for path, error in executor.map(_render_page, [(path, output_dir) for path in changed]):
+                if error:
+                    failed[path] = error
+                    print(f"  ❌ {path}: {error}")
+                else:
+                    print(f"  ✅ {path}")
+
+    for path in removed:
+        remove_page(output_dir, path)
+
+    copied = copy_static(output_dir)
+    print(f"📦 {copied} static files copied")
+
+    # Failed pages keep no version, so the next run retries them
+    save_manifest(output_dir, {
+        'fingerprint': fingerprint,
+        'pages': {path: version for path, version in pages.items() if path not in failed and version is not None},
+    })
+
+    if failed:
+        print(f"⚠️  {len(failed)} pages failed to render")
+    else:
+        print(f"🎉 Site exported to {output_dir}")
+    print("ℹ️  Route /contact, /subscribe and /api/gallery to the Flask app on your static host")
+    return len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the public site to static HTML")
+    parser.add_argument('-o', '--output', default=os.path.join(BASE_DIR, 'build'), help="output directory (default: build)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--full', action='store_true', help="re-render every page instead of only changed ones")
+    args = parser.parse_args()
+    return 1 if freeze(args.output, workers=args.workers, full=args.full) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
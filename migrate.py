@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Apply versioned SQL migrations to the database
+
+Migrations live in migrations/ as NNN_description.sql and are applied in order,
+each in its own transaction. Applied versions are recorded in the
+schema_migrations table, so running this again only applies new files.
+
+Usage:
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list applied and pending migrations
+
+Requires DATABASE_URL in your .env file (Supabase dashboard > Project Settings >
+Database > Connection string). The SQL files can also be pasted into the
+Supabase SQL Editor in order.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from config import Config
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_PATTERN = re.compile(r'^(\d+)_[\w-]+\.sql$')
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Get (version, filename, sql) for every migration file, in order"""
+    migrations = []
+    for name in os.listdir(directory):
+        match = MIGRATION_PATTERN.match(name)
+        if match:
+            with open(os.path.join(directory, name)) as f:
+                migrations.append((match.group(1), name, f.read()))
+    return sorted(migrations)
+
+
+def applied_versions(conn):
+    """Get the versions already applied, creating the tracking table if needed"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+    """)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+
+def apply_migrations(conn, migrations=None):
+    """Apply pending migrations in order and return the names applied"""
+    migrations = load_migrations() if migrations is None else migrations
+    with conn.transaction():
+        done = applied_versions(conn)
+
+    applied = []
+    for version, name, sql in migrations:
+        if version in done:
+            continue
+        with conn.transaction():
+            conn.execute(sql)
+            conn.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        applied.append(name)
+    return applied
+
+
+def connect():
+    """Open a connection to DATABASE_URL"""
+    try:
+        import psycopg
+    except ImportError:
+        raise RuntimeError("psycopg is not installed. Run: pip install -r requirements.txt")
+    if not Config.DATABASE_URL:
+        raise RuntimeError("DATABASE_URL not configured. Please set it in your .env file.")
+    return psycopg.connect(Config.DATABASE_URL, autocommit=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned SQL migrations")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations without applying")
+    args = parser.parse_args()
+
+    try:
+        conn = connect()
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+
+    with conn:
+        if args.status:
+            with conn.transaction():
+                done = applied_versions(conn)
+            for version, name, _ in load_migrations():
+                print(f"{'✅ applied' if version in done else '⏳ pending'}  {name}")
+            return 0
+
+        try:
+            applied = apply_migrations(conn)
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            return 1
+
+    if applied:
+        for name in applied:
+            print(f"✅ Applied {name}")
+    else:
+        print("✅ Database is up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+-- Migration 001: typed date columns for issues and moments
+-- magazine_issues.release_date and moments.date are free-text VARCHAR columns
+-- ("September 2024"), so ORDER BY sorts them alphabetically and no index can
+-- serve the sort. This adds real DATE columns next to them, backfills them,
+-- and keeps them in sync on every insert/update. The text columns are kept
+-- for display.
+
+-- Parse the date formats used in the text columns; returns NULL when unparseable
+CREATE OR REPLACE FUNCTION parse_loose_date(value TEXT)
+RETURNS DATE AS $$
+DECLARE
+    cleaned TEXT := regexp_replace(btrim(coalesce(value, '')), '\s+', ' ', 'g');
+BEGIN
+    IF cleaned = '' THEN
+        RETURN NULL;
+    END IF;
+
+    -- 2024-09-15 (optionally followed by a time)
+    IF cleaned ~ '^\d{4}-\d{2}-\d{2}' THEN
+        RETURN substr(cleaned, 1, 10)::DATE;
+    END IF;
+
+    -- 2024
+    IF cleaned ~ '^\d{4}$' THEN
+        RETURN make_date(cleaned::INTEGER, 1, 1);
+    END IF;
+
+    -- September 2024 / Sep 2024
+    IF cleaned ~* '^[a-z]+\.? \d{4}$' THEN
+        BEGIN
+            RETURN to_date(replace(cleaned, '.', ''), 'FMMonth YYYY');
+        EXCEPTION WHEN others THEN
+            RETURN to_date(replace(cleaned, '.', ''), 'Mon YYYY');
+        END;
+    END IF;
+
+    -- 15 September 2024
+    IF cleaned ~* '^\d{1,2} [a-z]+ \d{4}$' THEN
+        BEGIN
+            RETURN to_date(cleaned, 'DD FMMonth YYYY');
+        EXCEPTION WHEN others THEN
+            RETURN to_date(cleaned, 'DD Mon YYYY');
+        END;
+    END IF;
+
+    -- September 15, 2024
+    IF cleaned ~* '^[a-z]+ \d{1,2},? \d{4}$' THEN
+        BEGIN
+            RETURN to_date(replace(cleaned, ',', ''), 'FMMonth DD YYYY');
+        EXCEPTION WHEN others THEN
+            RETURN to_date(replace(cleaned, ',', ''), 'Mon DD YYYY');
+        END;
+    END IF;
+
+    RETURN NULL;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Add the typed columns
+ALTER TABLE magazine_issues ADD COLUMN IF NOT EXISTS release_on DATE;
+ALTER TABLE moments ADD COLUMN IF NOT EXISTS moment_on DATE;
+
+-- Backfill existing rows
+UPDATE magazine_issues SET release_on = parse_loose_date(release_date)
+WHERE release_on IS DISTINCT FROM parse_loose_date(release_date);
+
+UPDATE moments SET moment_on = parse_loose_date(date)
+WHERE moment_on IS DISTINCT FROM parse_loose_date(date);
+
+-- Keep the typed columns in sync with the text columns
+CREATE OR REPLACE FUNCTION sync_issue_release_on()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.release_on = parse_loose_date(NEW.release_date);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_moment_on()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.moment_on = parse_loose_date(NEW.date);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sync_magazine_issues_release_on ON magazine_issues;
+CREATE TRIGGER sync_magazine_issues_release_on BEFORE INSERT OR UPDATE OF release_date ON magazine_issues
+    FOR EACH ROW EXECUTE FUNCTION sync_issue_release_on();
+
+DROP TRIGGER IF EXISTS sync_moments_moment_on ON moments;
+CREATE TRIGGER sync_moments_moment_on BEFORE INSERT OR UPDATE OF date ON moments
+    FOR EACH ROW EXECUTE FUNCTION sync_moment_on();
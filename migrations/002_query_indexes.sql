@@ -0,0 +1,53 @@
+-- Migration 002: indexes matching the DatabaseService query shapes
+-- Each index serves both the filter and the ORDER BY of its query, so rows come
+-- back pre-sorted from the index instead of going through a separate sort.
+
+-- get_all_issues: ORDER BY release_on DESC NULLS LAST, id DESC
+CREATE INDEX IF NOT EXISTS idx_magazine_issues_release_on
+    ON magazine_issues (release_on DESC NULLS LAST, id DESC);
+
+-- get_issues_by_type: WHERE journal_type = ? ORDER BY release_on DESC NULLS LAST, id DESC
+CREATE INDEX IF NOT EXISTS idx_magazine_issues_type_release_on
+    ON magazine_issues (journal_type, release_on DESC NULLS LAST, id DESC);
+
+-- get_articles_by_issue: WHERE issue_id = ? ORDER BY created_at DESC
+-- (replaces the single-column index, which the composite index covers)
+CREATE INDEX IF NOT EXISTS idx_articles_issue_created
+    ON articles (issue_id, created_at DESC);
+DROP INDEX IF EXISTS idx_articles_issue_id;
+
+-- get_photos_by_issue: WHERE issue_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_photos_issue_created
+    ON photos (issue_id, created_at DESC);
+DROP INDEX IF EXISTS idx_photos_issue_id;
+
+-- get_contributors_by_issue: WHERE issue_id = ? ORDER BY id
+-- (replaces the single-column index, which the composite index covers)
+CREATE INDEX IF NOT EXISTS idx_contributors_issue_id_order
+    ON contributors (issue_id, id);
+DROP INDEX IF EXISTS idx_contributors_issue_id;
+
+-- get_gallery_images: WHERE issue_id IS NULL ORDER BY created_at DESC
+-- (a btree on issue_id cannot serve IS NULL together with the sort)
+CREATE INDEX IF NOT EXISTS idx_photos_gallery_created
+    ON photos (created_at DESC, id DESC) WHERE issue_id IS NULL;
+
+-- update_gallery_image / delete_gallery_image: WHERE file_url = ? AND issue_id IS NULL
+CREATE INDEX IF NOT EXISTS idx_photos_gallery_file_url
+    ON photos (file_url) WHERE issue_id IS NULL;
+
+-- get_all_moments: ORDER BY moment_on DESC NULLS LAST, id DESC
+CREATE INDEX IF NOT EXISTS idx_moments_moment_on
+    ON moments (moment_on DESC NULLS LAST, id DESC);
+
+-- get_editorial_team: WHERE team_type = ? ORDER BY display_order
+-- (the editorial_team table is created from the Supabase dashboard, so only
+-- index it where it exists)
+DO $$
+BEGIN
+    IF to_regclass('editorial_team') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_editorial_team_type_order
+            ON editorial_team (team_type, display_order);
+    END IF;
+END;
+$$;
@@ -0,0 +1,99 @@
+-- Migration 003: natural keys for bulk import
+-- bulk_content.py upserts rows on these keys, so re-running an import updates
+-- the rows it created earlier instead of duplicating them.
+--
+-- Issues are matched on a dedicated import_key column rather than on their
+-- title, so two issues may still share a title. Existing issues get the slug
+-- of their title as key where no other issue has the same slug; the rest keep
+-- a NULL key until they are imported with an explicit one.
+--
+-- Articles get an import_key of their own too, unique within the issue, so
+-- an issue can still hold several articles with the same title (three
+-- 'Untitled' poems). Existing articles are keyed by the slug of their title,
+-- numbered from the second one with the same slug in an issue ('untitled',
+-- 'untitled--2', ...; a slug never has '--', so these cannot clash with the
+-- title 'Untitled 2'), which is the key an import gives them by default.
+-- Articles added by hand keep a NULL key, and NULL keys never conflict.
+--
+-- Within an issue, contributor name/role pairs and photo filenames become
+-- unique (and gallery photo filenames, whose issue_id is NULL). If the data
+-- already has duplicates the migration stops and lists them; rename or
+-- delete them and run it again.
+
+ALTER TABLE magazine_issues ADD COLUMN IF NOT EXISTS import_key VARCHAR(255);
+
+-- Same slug as slugify() in bulk_content.py: 'Fall/Winter 2025' -> 'fall-winter-2025'
+UPDATE magazine_issues i SET import_key = keys.slug
+FROM (
+    SELECT min(id) AS id, slug
+    FROM (SELECT id, btrim(regexp_replace(lower(title), '[^a-z0-9]+', '-', 'g'), '-') AS slug
+          FROM magazine_issues) titles
+    WHERE slug <> ''
+    GROUP BY slug
+    HAVING count(*) = 1
+) keys
+WHERE i.id = keys.id AND i.import_key IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_magazine_issues_import_key
+    ON magazine_issues (import_key);
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS import_key VARCHAR(255);
+
+-- Same keys as article_keys() in bulk_content.py
+UPDATE articles a SET import_key = keys.import_key
+FROM (
+    SELECT id, slug || CASE WHEN position > 1 THEN '--' || position ELSE '' END AS import_key
+    FROM (SELECT id, slug, row_number() OVER (PARTITION BY issue_id, slug ORDER BY id) AS position
+          FROM (SELECT id, issue_id,
+                       coalesce(nullif(btrim(regexp_replace(lower(coalesce(title, '')), '[^a-z0-9]+', '-', 'g'), '-'), ''),
+                                'article') AS slug
+                FROM articles WHERE import_key IS NULL) titles) numbered
+) keys
+WHERE a.id = keys.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_articles_issue_import_key
+    ON articles (issue_id, import_key);
+
+DO $$
+DECLARE
+    duplicates TEXT;
+BEGIN
+    SELECT string_agg(format('issue %s: %L as %L (%s rows)', issue_id, name, role_type, rows), '; ') INTO duplicates
+    FROM (SELECT issue_id, name, role_type, count(*) AS rows FROM contributors
+          GROUP BY issue_id, name, role_type HAVING count(*) > 1) d;
+    IF duplicates IS NOT NULL THEN
+        RAISE EXCEPTION 'Duplicate contributors: %', duplicates
+            USING HINT = 'Rename or delete the duplicates, then run the migration again';
+    END IF;
+
+    -- GROUP BY puts NULL issue_ids together, so gallery duplicates show up too
+    SELECT string_agg(format('%s: %L (%s rows)', coalesce('issue ' || issue_id, 'gallery'), filename, rows), '; ')
+        INTO duplicates
+    FROM (SELECT issue_id, filename, count(*) AS rows FROM photos
+          GROUP BY issue_id, filename HAVING count(*) > 1) d;
+    IF duplicates IS NOT NULL THEN
+        RAISE EXCEPTION 'Duplicate photo filenames: %', duplicates
+            USING HINT = 'Rename or delete the duplicates, then run the migration again';
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_contributors_issue_name_role
+    ON contributors (issue_id, name, role_type);
+
+-- A plain unique index treats every NULL issue_id as different, so it would
+-- not stop duplicate gallery photos. Postgres 15 can treat them as equal;
+-- older servers get a separate partial index for the gallery.
+DO $$
+BEGIN
+    IF current_setting('server_version_num')::INTEGER >= 150000 THEN
+        EXECUTE 'CREATE UNIQUE INDEX IF NOT EXISTS uq_photos_issue_filename '
+                'ON photos (issue_id, filename) NULLS NOT DISTINCT';
+    ELSE
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_photos_issue_filename
+            ON photos (issue_id, filename);
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_photos_gallery_filename
+            ON photos (filename) WHERE issue_id IS NULL;
+    END IF;
+END;
+$$;
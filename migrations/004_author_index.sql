@@ -0,0 +1,179 @@
+-- Migration 004: cross-issue author index
+-- Article authors, contributors, award winners and Who's Who entries store the
+-- person's name as free text on each row, so finding everything one writer has
+-- done means scanning every table. This adds an authors table keyed by a slug
+-- of the normalized name, and an author_credits table mapping each author to
+-- the rows that credit them. Triggers keep both up to date on every write.
+--
+-- The names are normalized here and nowhere else: the app asks author_links()
+-- for the slugs it links to and purges, so its links always match the index.
+
+-- Lowercase, strip punctuation and leading honorifics: 'Dr. Thangjam Ibopishak Singh'
+-- and 'thangjam ibopishak singh' both become 'thangjam ibopishak singh'. The
+-- database's default collation is pinned, since a caller's collation would
+-- change lower() (the trigger passes TG_TABLE_NAME, whose "C" collation only
+-- lowercases ASCII, so 'Émile' would stay 'Émile')
+CREATE OR REPLACE FUNCTION normalize_author_name(value TEXT)
+RETURNS TEXT AS $$
+    SELECT regexp_replace(
+        btrim(regexp_replace(lower(translate(normalize(coalesce(value, '') COLLATE "default", NFKC),
+                                             '!"#$%&''()*+,-./:;<=>?@[\]^_`{|}~‘’“”',
+                                             '                                      ')),
+                             '\s+', ' ', 'g')),
+        '^((dr|prof|professor|mr|mrs|ms|miss|shri|sri|smt|shrimati|late) )+', '')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- URL slug for a name: 'thangjam-ibopishak-singh'
+CREATE OR REPLACE FUNCTION author_slug(value TEXT)
+RETURNS TEXT AS $$
+    SELECT replace(normalize_author_name(value), ' ', '-')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- An article byline can credit several people: 'A & B', 'A and B', 'A; B'
+CREATE OR REPLACE FUNCTION split_author_names(value TEXT)
+RETURNS SETOF TEXT AS $$
+    SELECT btrim(name) FROM regexp_split_to_table(coalesce(value, '') COLLATE "default", '\s*(&|;|\mand\M)\s*', 'i') AS name
+    WHERE btrim(name) <> ''
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The people credited by each of a list of name values, with their slugs:
+-- every name of a byline if split is set, otherwise the whole value. Rows come
+-- in the order of the values, then of the names within each byline.
+CREATE OR REPLACE FUNCTION author_links(names TEXT[], split BOOLEAN)
+RETURNS TABLE (value TEXT, name TEXT, slug TEXT) AS $$
+    SELECT v.value, n.name, author_slug(n.name)
+    FROM unnest(names) WITH ORDINALITY AS v (value, position)
+    CROSS JOIN LATERAL (
+        SELECT s.name, s.position FROM split_author_names(v.value) WITH ORDINALITY AS s (name, position)
+        WHERE author_links.split
+        UNION ALL
+        SELECT btrim(v.value), 1 WHERE NOT author_links.split AND btrim(coalesce(v.value, '')) <> ''
+    ) AS n (name, position)
+    ORDER BY v.position, n.position
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS authors (
+    id SERIAL PRIMARY KEY,
+    slug VARCHAR(255) NOT NULL UNIQUE,
+    name VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS author_credits (
+    author_id INTEGER NOT NULL REFERENCES authors(id) ON DELETE CASCADE,
+    source_table VARCHAR(50) NOT NULL,
+    source_id INTEGER NOT NULL,
+    issue_id INTEGER,
+    PRIMARY KEY (source_table, source_id, author_id)
+);
+
+-- get_author_by_slug: WHERE author_id = ? (the slug lookup uses the UNIQUE index)
+CREATE INDEX IF NOT EXISTS idx_author_credits_author
+    ON author_credits (author_id, source_table, source_id);
+
+-- Authors credited in an issue, whose pages list it: WHERE issue_id = ANY(?)
+CREATE INDEX IF NOT EXISTS idx_author_credits_issue
+    ON author_credits (issue_id);
+
+ALTER TABLE authors ENABLE ROW LEVEL SECURITY;
+ALTER TABLE author_credits ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read access to authors" ON authors
+    FOR SELECT USING (true);
+
+CREATE POLICY "Allow public read access to author_credits" ON author_credits
+    FOR SELECT USING (true);
+
+-- Replace the credits of a set of rows: drop the credits of removed_ids, then
+-- credit the names in each row of changed (a JSON array of rows). Authors left
+-- without credits are removed, and every author involved gets a new
+-- updated_at so static exports re-render their pages.
+CREATE OR REPLACE FUNCTION index_author_credits(source TEXT, removed_ids INTEGER[], changed JSONB,
+                                                name_column TEXT, split BOOLEAN)
+RETURNS VOID AS $$
+DECLARE
+    released INTEGER[];
+BEGIN
+    WITH removed AS (
+        DELETE FROM author_credits WHERE source_table = source AND source_id = ANY(removed_ids) RETURNING author_id
+    )
+    SELECT coalesce(array_agg(DISTINCT author_id), '{}') INTO released FROM removed;
+
+    WITH credited AS (
+        SELECT (r ->> 'id')::INTEGER AS source_id, (r ->> 'issue_id')::INTEGER AS issue_id, l.name, l.slug
+        FROM jsonb_array_elements(coalesce(changed, '[]')) AS r
+        CROSS JOIN LATERAL author_links(ARRAY[r ->> name_column], split) AS l
+    ), stored AS (
+        -- A Who's Who entry names the person the way the site presents them
+        INSERT INTO authors (slug, name)
+        SELECT DISTINCT ON (slug) slug, name FROM credited WHERE slug <> '' ORDER BY slug, source_id
+        ON CONFLICT (slug) DO UPDATE
+            SET name = CASE WHEN source = 'whos_who' THEN EXCLUDED.name ELSE authors.name END,
+                updated_at = NOW()
+        RETURNING id, slug
+    )
+    INSERT INTO author_credits (author_id, source_table, source_id, issue_id)
+    SELECT stored.id, source, credited.source_id, credited.issue_id
+    FROM credited JOIN stored USING (slug)
+    ON CONFLICT DO NOTHING;
+
+    DELETE FROM authors a WHERE a.id = ANY(released)
+        AND NOT EXISTS (SELECT 1 FROM author_credits c WHERE c.author_id = a.id);
+    UPDATE authors SET updated_at = NOW() WHERE id = ANY(released);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path FROM CURRENT;
+
+-- Statement-level, so a bulk import re-indexes its rows in one pass rather
+-- than once per row. Trigger arguments: the column holding the name, and
+-- 'split' for bylines that can credit several people.
+CREATE OR REPLACE FUNCTION sync_author_credits()
+RETURNS TRIGGER AS $$
+DECLARE
+    removed_ids INTEGER[];
+    changed JSONB;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT array_agg(id) INTO removed_ids FROM old_rows;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT jsonb_agg(to_jsonb(r)) INTO changed FROM new_rows r;
+    END IF;
+    PERFORM index_author_credits(TG_TABLE_NAME, removed_ids, changed, TG_ARGV[0],
+                                 TG_NARGS > 1 AND TG_ARGV[1] = 'split');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path FROM CURRENT;
+
+-- Transition tables need one trigger per event
+DO $$
+DECLARE
+    source RECORD;
+    trigger_name TEXT;
+BEGIN
+    FOR source IN
+        SELECT * FROM (VALUES ('articles', 'author', 'split'), ('contributors', 'name', ''),
+                              ('awards', 'awardee_name', ''), ('whos_who', 'name', '')) AS s (tbl, name_column, mode)
+    LOOP
+        trigger_name := 'sync_' || source.tbl || '_author_credits';
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', trigger_name || '_insert', source.tbl);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION sync_author_credits(%L, %L)',
+                       trigger_name || '_insert', source.tbl, source.name_column, source.mode);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', trigger_name || '_update', source.tbl);
+        EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION sync_author_credits(%L, %L)',
+                       trigger_name || '_update', source.tbl, source.name_column, source.mode);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', trigger_name || '_delete', source.tbl);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION sync_author_credits(%L, %L)',
+                       trigger_name || '_delete', source.tbl, source.name_column, source.mode);
+    END LOOP;
+END;
+$$;
+
+-- Index the rows that already exist (Who's Who last, so its names win)
+SELECT index_author_credits('articles', NULL, jsonb_agg(to_jsonb(t)), 'author', TRUE) FROM articles t;
+SELECT index_author_credits('contributors', NULL, jsonb_agg(to_jsonb(t)), 'name', FALSE) FROM contributors t;
+SELECT index_author_credits('awards', NULL, jsonb_agg(to_jsonb(t)), 'awardee_name', FALSE) FROM awards t;
+SELECT index_author_credits('whos_who', NULL, jsonb_agg(to_jsonb(t)), 'name', FALSE) FROM whos_who t;
@@ -0,0 +1,290 @@
+"""
+Compact models for the content DatabaseService returns.
+
+Rows from PostgREST arrive as dicts, and a dict per row (plus the same keys
+repeated in every one of them) adds up once the whole catalogue sits in the
+content cache of every gunicorn worker. These classes store each column in a
+__slots__ attribute instead, intern short strings that repeat across rows
+(authors, categories, roles), and leave large text fields (article content,
+biographies, award speeches) out of list results until they are read.
+
+Models still behave like the dicts they replace where the app and templates
+need it: attribute access, ``row['key']``, ``row.get()``, ``'key' in row`` and
+``to_dict()``. Columns a model does not declare are kept in a small per-row
+dict, so new database columns keep reaching the templates.
+
+Each row keeps a reference to the loader that fetches its deferred columns,
+passed in by the DatabaseService that built it, so rows from different
+backends can share a process. Cached rows are shared between threads, so
+filling in a deferred column happens under a lock.
+"""
+
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from config import Config
+
+# Fetches deferred columns: loader(table, ids, fields) -> rows, or None on failure
+Loader = Callable[[str, List[Any], Sequence[str]], Optional[List[Dict[str, Any]]]]
+
+_fill_lock = threading.Lock()
+
+
+class Model:
+    """Base class for a database row stored in slots"""
+
+    __slots__ = ('_extra', '_loader')
+
+    _table: Optional[str] = None
+    # Database columns, in the order they are usually selected
+    _fields: Sequence[str] = ()
+    # Large text columns left out of list results and loaded on first access
+    _deferred: Sequence[str] = ()
+    # Short strings repeated across many rows
+    _interned: Sequence[str] = ()
+    # Attributes that are not columns, attached after loading
+    _computed: Sequence[str] = ()
+    # Deferred column -> (attribute, length) of a short preview kept in list results
+    _previews: Dict[str, tuple] = {}
+
+    def __init__(self, **values):
+        cls = type(self)
+        for name in cls._fields:
+            if name in values:
+                value = values.pop(name)
+                if name in cls._interned and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(self, name, value)
+            elif name not in cls._deferred:
+                setattr(self, name, None)
+        for name in cls._computed:
+            if name in values:
+                setattr(self, name, values.pop(name))
+        self._extra = values or None
+        self._loader = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], defer: bool = False, loader: Optional[Loader] = None):
+        """Build a model from a database row, dropping deferred columns if defer is set
+        
+        loader fetches the deferred columns later; pass the same object for
+        every row, since each row keeps a reference to it.
+        """
+        values = dict(row)
+        if defer:
+            for name in cls._deferred:
+                text = values.pop(name, None)
+                if name in cls._previews:
+                    attribute, length = cls._previews[name]
+                    values[attribute] = text[:length] + '...' if text and len(text) > length else text
+        instance = cls(**values)
+        instance._loader = loader
+        return instance
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], defer: bool = False,
+                  loader: Optional[Loader] = None) -> List['Model']:
+        return [cls.from_row(row, defer, loader) for row in rows]
+
+    @classmethod
+    def load_deferred(cls, instances: Iterable['Model'], fields: Sequence[str] = None):
+        """Fetch the deferred columns of many rows in a single query"""
+        fields = tuple(fields or cls._deferred)
+        # loader -> id -> rows, so rows from different backends use their own
+        pending: Dict[Loader, Dict[Any, List[Model]]] = {}
+        for instance in instances:
+            if (instance.id is not None and instance._loader is not None
+                    and not all(instance._is_set(name) for name in fields)):
+                pending.setdefault(instance._loader, {}).setdefault(instance.id, []).append(instance)
+
+        for loader, groups in pending.items():
+            # Queried without the lock, so one slow query never holds up other
+            # threads; two threads may fetch the same row, and the first wins
+            rows = loader(cls._table, list(groups), fields)
+            if rows is None:
+                # Leave the fields unloaded so the next access tries again
+                continue
+            found = {row['id']: row for row in rows}
+            with _fill_lock:
+                for row_id, group in groups.items():
+                    row = found.get(row_id, {})
+                    for instance in group:
+                        for name in fields:
+                            if not instance._is_set(name):
+                                setattr(instance, name, row.get(name))
+
+    def _is_set(self, name: str) -> bool:
+        try:
+            object.__getattribute__(self, name)
+            return True
+        except AttributeError:
+            return False
+
+    def __getattr__(self, name):
+        # Only called when an attribute is missing: an unloaded deferred
+        # column, an unset computed attribute, or an undeclared column
+        cls = type(self)
+        if name in cls._deferred:
+            cls.load_deferred([self], (name,))
+            try:
+                return object.__getattribute__(self, name)
+            except AttributeError:
+                return None
+        extra = object.__getattribute__(self, '_extra')
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(f"{cls.__name__!r} object has no attribute {name!r}")
+
+    def _set(self, name: str, value: Any):
+        """Set a slot, or an undeclared column in the extras dict"""
+        if name in type(self).__slots__:
+            setattr(self, name, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+
+    # Dict-style access, so code written for PostgREST rows keeps working
+    def __contains__(self, key) -> bool:
+        cls = type(self)
+        if key in cls._fields:
+            return True
+        if key in cls._computed:
+            return self._is_set(key)
+        return bool(self._extra) and key in self._extra
+
+    def __getitem__(self, key):
+        if key in self:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __delitem__(self, key):
+        if key in type(self).__slots__ and self._is_set(key):
+            delattr(self, key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        """Names of the loaded columns and attached attributes"""
+        names = [name for name in type(self)._fields + tuple(type(self)._computed) if self._is_set(name)]
+        return names + list(self._extra or ())
+
+    def copy(self, **changes):
+        """Shallow copy, optionally with some attributes replaced"""
+        clone = object.__new__(type(self))
+        for name in type(self).__slots__:
+            if self._is_set(name):
+                object.__setattr__(clone, name, object.__getattribute__(self, name))
+        object.__setattr__(clone, '_extra', dict(self._extra) if self._extra else None)
+        object.__setattr__(clone, '_loader', self._loader)
+        for name, value in changes.items():
+            clone._set(name, value)
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the loaded values (deferred columns only if loaded), for JSON"""
+        return {name: _plain(getattr(self, name)) for name in self.keys()}
+
+    def __repr__(self):
+        return f"<{type(self).__name__} id={self.get('id')!r}>"
+
+
+def _plain(value):
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+class Issue(Model):
+    _table = Config.ISSUES_TABLE
+    _fields = ('id', 'title', 'description', 'release_date', 'release_on', 'journal_type', 'editorial',
+               'cover_image', 'cover_image_url', 'pdf_url', 'is_latest_issue', 'import_key', 'created_at', 'updated_at')
+    _interned = ('journal_type', 'release_date')
+    _computed = ('featured_articles', 'contributors', 'gallery', 'articles_by_category')
+    __slots__ = _fields + _computed
+
+
+class Article(Model):
+    _table = Config.ARTICLES_TABLE
+    _fields = ('id', 'issue_id', 'title', 'content', 'author', 'category', 'import_key', 'created_at', 'updated_at')
+    _deferred = ('content',)
+    _interned = ('author', 'category')
+    __slots__ = _fields
+
+
+class Contributor(Model):
+    _table = Config.CONTRIBUTORS_TABLE
+    _fields = ('id', 'issue_id', 'name', 'role', 'role_type', 'photo', 'photo_url', 'bio',
+               'created_at', 'updated_at')
+    _deferred = ('bio',)
+    _interned = ('name', 'role', 'role_type')
+    __slots__ = _fields
+
+
+class Photo(Model):
+    _table = Config.PHOTOS_TABLE
+    _fields = ('id', 'issue_id', 'filename', 'caption', 'alt_text', 'file_url', 'file_size', 'mime_type',
+               'created_at', 'updated_at')
+    _interned = ('mime_type',)
+    __slots__ = _fields
+
+
+class Moment(Model):
+    _table = Config.MOMENTS_TABLE
+    _fields = ('id', 'title', 'date', 'moment_on', 'description', 'image', 'image_url', 'category',
+               'created_at', 'updated_at')
+    _interned = ('category',)
+    __slots__ = _fields
+
+
+class Award(Model):
+    _table = 'awards'
+    _fields = ('id', 'year', 'awardee_name', 'awardee_photo_url', 'awardee_bio', 'award_speech',
+               'ceremony_photos', 'literary_genre', 'created_at', 'updated_at')
+    _deferred = ('award_speech',)
+    _interned = ('literary_genre',)
+    __slots__ = _fields
+
+
+class WhosWho(Model):
+    _table = 'whos_who'
+    _fields = ('id', 'name', 'photo_url', 'bio', 'birth_year', 'death_year', 'notable_works',
+               'awards_received', 'literary_genre', 'created_at', 'updated_at')
+    _deferred = ('bio',)
+    _interned = ('literary_genre',)
+    _computed = ('bio_preview',)
+    _previews = {'bio': ('bio_preview', 100)}
+    __slots__ = _fields + _computed
+
+
+class TeamMember(Model):
+    _table = 'editorial_team'
+    _fields = ('id', 'name', 'role', 'department', 'affiliation', 'photo_url', 'team_type', 'display_order',
+               'created_at', 'updated_at')
+    _interned = ('role', 'department', 'affiliation', 'team_type')
+    __slots__ = _fields
+
+
+class Author(Model):
+    _table = 'authors'
+    _fields = ('id', 'slug', 'name', 'created_at', 'updated_at')
+    # issues: the issues crediting the author, each carrying only the author's
+    # featured_articles and contributors; profile: their Who's Who entry
+    _computed = ('issues', 'awards', 'profile')
+    __slots__ = _fields + _computed
@@ -0,0 +1,593 @@
+"""
+Postgres backend for DatabaseService.
+
+Queries the database directly over a pool of psycopg connections instead of
+through the Supabase HTTP API. Read queries are sent as prepared statements,
+and get_hydrated_issues loads every issue with its articles, contributors and
+photos in a single query. Rows are serialised with to_json() in Postgres, the
+way PostgREST builds its responses, so both backends return the same values
+(timestamps as ISO strings, arrays as lists).
+
+Select it with DATABASE_BACKEND=postgres and DATABASE_URL. Prepared statements
+need a direct or session-mode connection (port 5432), not Supabase's
+transaction pooler on port 6543. Files are still stored in Supabase Storage,
+so the upload methods also need SUPABASE_URL and SUPABASE_KEY.
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+from psycopg import sql
+from psycopg.types.json import Json
+from psycopg_pool import ConnectionPool
+from supabase import create_client
+
+from config import Config
+from cache import content_cache
+from database import DATE_COLUMNS, DatabaseService, decode_cursor, encode_cursor
+from models import Issue, Article, Contributor, Photo, Moment, Award, WhosWho, TeamMember, Author
+
+# Who's Who list rows carry just enough of each bio for the list page's preview
+WHOS_WHO_LIST_ROW = "to_jsonb(t) || jsonb_build_object('bio', left(t.bio, 101))"
+
+# Every issue with its articles, contributors and photos (large text left out)
+HYDRATED_ISSUES_SQL = """
+SELECT to_jsonb(t) || jsonb_build_object(
+           'featured_articles', COALESCE(articles.rows, '[]'::jsonb),
+           'contributors', COALESCE(contributors.rows, '[]'::jsonb),
+           'gallery', COALESCE(photos.rows, '[]'::jsonb))
+FROM {issues} t
+LEFT JOIN LATERAL (
+    SELECT jsonb_agg(to_jsonb(a) - 'content' ORDER BY a.created_at DESC) AS rows
+    FROM {articles} a WHERE a.issue_id = t.id
+) articles ON TRUE
+LEFT JOIN LATERAL (
+    SELECT jsonb_agg(to_jsonb(c) - 'bio' ORDER BY c.id) AS rows
+    FROM {contributors} c WHERE c.issue_id = t.id
+) contributors ON TRUE
+LEFT JOIN LATERAL (
+    SELECT jsonb_agg(to_jsonb(p) ORDER BY p.created_at DESC) AS rows
+    FROM {photos} p WHERE p.issue_id = t.id
+) photos ON TRUE
+ORDER BY {order}
+"""
+
+
+# An author with every row credited to them, through the author_credits index
+AUTHOR_SQL = """
+SELECT to_jsonb(t) || jsonb_build_object(
+           'articles', COALESCE((
+               SELECT jsonb_agg(to_jsonb(a) - 'content' ORDER BY a.created_at DESC, a.id DESC)
+               FROM author_credits c JOIN {articles} a ON a.id = c.source_id
+               WHERE c.author_id = t.id AND c.source_table = {articles_name}), '[]'::jsonb),
+           'contributors', COALESCE((
+               SELECT jsonb_agg(to_jsonb(p) - 'bio' ORDER BY p.id)
+               FROM author_credits c JOIN {contributors} p ON p.id = c.source_id
+               WHERE c.author_id = t.id AND c.source_table = {contributors_name}), '[]'::jsonb),
+           'awards', COALESCE((
+               SELECT jsonb_agg(to_jsonb(w) - 'award_speech' ORDER BY w.year DESC, w.id DESC)
+               FROM author_credits c JOIN awards w ON w.id = c.source_id
+               WHERE c.author_id = t.id AND c.source_table = 'awards'), '[]'::jsonb),
+           'whos_who', COALESCE((
+               SELECT jsonb_agg(to_jsonb(w) || jsonb_build_object('bio', left(w.bio, 101)) ORDER BY w.id)
+               FROM author_credits c JOIN whos_who w ON w.id = c.source_id
+               WHERE c.author_id = t.id AND c.source_table = 'whos_who'), '[]'::jsonb),
+           'issues', COALESCE((
+               SELECT jsonb_agg(to_jsonb(i) - 'editorial' ORDER BY {issue_order})
+               FROM {issues} i
+               WHERE i.id IN (SELECT c.issue_id FROM author_credits c WHERE c.author_id = t.id)), '[]'::jsonb))
+FROM authors t
+WHERE t.slug = %s
+"""
+
+class PostgresDatabaseService(DatabaseService):
+    """DatabaseService that talks to Postgres directly through a connection pool"""
+
+    def __init__(self):
+        if not Config.DATABASE_URL:
+            raise ValueError("Postgres connection not configured. Please set the DATABASE_URL environment variable.")
+
+        self.pool = ConnectionPool(Config.DATABASE_URL, min_size=1, max_size=Config.DATABASE_POOL_SIZE,
+                                   kwargs={'autocommit': True}, timeout=10, open=True)
+        # Supabase is only needed for file storage
+        self.supabase = None
+        if Config.SUPABASE_URL and Config.SUPABASE_KEY:
+            self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        self.typed_dates = True
+        self.author_index = True
+        self.loader = self.load_fields
+
+    # Query helpers
+    def _query(self, query, params=None, prepare: bool = True) -> List[Any]:
+        """Run a query and return the first column of every row"""
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute(query, params, prepare=prepare)]
+
+    def _select(self, table: str, where: str = 'TRUE', order: str = '', params=None,
+                row: str = 'to_json(t)') -> List[Dict[str, Any]]:
+        """Get rows of a table as JSON objects, like a PostgREST select"""
+        query = sql.SQL("SELECT {row} FROM {table} t WHERE {where} {order}").format(
+            row=sql.SQL(row), table=sql.Identifier(table), where=sql.SQL(where), order=sql.SQL(order))
+        return self._query(query, params)
+
+    def _date_order(self, table: str, alias: str = 't') -> str:
+        """ORDER BY terms sorting issues or moments newest first (see DatabaseService._newest_first)"""
+        typed, text = DATE_COLUMNS[table]
+        if self.typed_dates:
+            return f"{alias}.{typed} DESC NULLS LAST, {alias}.id DESC"
+        return f"{alias}.{text} DESC, {alias}.id DESC"
+
+    def _select_one(self, table: str, row_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._select(table, 't.id = %s', params=(row_id,))
+        return rows[0] if rows else None
+
+    @staticmethod
+    def _columns(names):
+        return sql.SQL(', ').join(sql.Identifier(name) for name in names)
+
+    @staticmethod
+    def _value(value):
+        return Json(value) if isinstance(value, dict) else value
+
+    def _insert(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        query = sql.SQL("WITH t AS (INSERT INTO {table} ({columns}) VALUES ({values}) RETURNING *) "
+                        "SELECT to_json(t) FROM t").format(
+            table=sql.Identifier(table), columns=self._columns(data),
+            values=sql.SQL(', ').join(sql.Placeholder() * len(data)))
+        rows = self._query(query, [self._value(value) for value in data.values()], prepare=False)
+        return rows[0] if rows else None
+
+    @staticmethod
+    def _where(conditions: Dict[str, Any]):
+        """WHERE clause and parameters matching every column, with None meaning IS NULL"""
+        clauses, params = [], []
+        for column, value in conditions.items():
+            if value is None:
+                clauses.append(sql.SQL("{} IS NULL").format(sql.Identifier(column)))
+            else:
+                clauses.append(sql.SQL("{} = %s").format(sql.Identifier(column)))
+                params.append(value)
+        return sql.SQL(' AND ').join(clauses), params
+
+    def _update(self, table: str, data: Dict[str, Any], conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        where, params = self._where(conditions)
+        query = sql.SQL("WITH t AS (UPDATE {table} SET {assignments} WHERE {where} RETURNING *) "
+                        "SELECT to_json(t) FROM t").format(
+            table=sql.Identifier(table), where=where,
+            assignments=sql.SQL(', ').join(sql.SQL("{} = %s").format(sql.Identifier(column)) for column in data))
+        return self._query(query, [self._value(value) for value in data.values()] + params, prepare=False)
+
+    def _delete(self, table: str, conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        where, params = self._where(conditions)
+        query = sql.SQL("WITH t AS (DELETE FROM {table} WHERE {where} RETURNING *) SELECT to_json(t) FROM t").format(
+            table=sql.Identifier(table), where=where)
+        return self._query(query, params, prepare=False)
+
+    # Magazine Issues
+    def _all_issues(self) -> List[Issue]:
+        return Issue.from_rows(self._with_date_fallback(
+            lambda: self._select(Config.ISSUES_TABLE, order=f"ORDER BY {self._date_order(Config.ISSUES_TABLE)}")))
+
+    def get_issues_by_type(self, journal_type: str) -> List[Issue]:
+        """Get magazine issues by journal type (literary or research)"""
+        try:
+            return Issue.from_rows(self._with_date_fallback(
+                lambda: self._select(Config.ISSUES_TABLE, 't.journal_type = %s',
+                                     f"ORDER BY {self._date_order(Config.ISSUES_TABLE)}", (journal_type,))))
+        except Exception as e:
+            print(f"Error fetching {journal_type} issues: {e}")
+            return []
+
+    def get_issue_by_id(self, issue_id: int) -> Optional[Issue]:
+        """Get a specific issue by ID"""
+        try:
+            row = self._select_one(Config.ISSUES_TABLE, issue_id)
+            return Issue.from_row(row) if row else None
+        except Exception as e:
+            print(f"Error fetching issue {issue_id}: {e}")
+            return None
+
+    def create_issue(self, issue_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new magazine issue"""
+        try:
+            issue = self._insert(Config.ISSUES_TABLE, issue_data)
+            if issue:
+                self._invalidate(Config.ISSUES_TABLE, issue)
+            return issue
+        except Exception as e:
+            print(f"Error creating issue: {e}")
+            return None
+
+    def update_issue(self, issue_id: int, issue_data: Dict[str, Any]) -> bool:
+        """Update an existing issue"""
+        try:
+            rows = self._update(Config.ISSUES_TABLE, issue_data, {'id': issue_id})
+            if rows:
+                self._invalidate(Config.ISSUES_TABLE, {'id': issue_id})
+            return bool(rows)
+        except Exception as e:
+            print(f"Error updating issue {issue_id}: {e}")
+            return False
+
+    def delete_issue(self, issue_id: int) -> bool:
+        """Delete an issue"""
+        try:
+            # Before the delete takes the issue's credits with it
+            authors = self.get_credited_slugs(Config.ISSUES_TABLE, [{'id': issue_id}])
+            rows = self._delete(Config.ISSUES_TABLE, {'id': issue_id})
+            if rows:
+                content_cache.invalidate(Config.ISSUES_TABLE, {'id': issue_id}, authors=authors)
+            return bool(rows)
+        except Exception as e:
+            print(f"Error deleting issue {issue_id}: {e}")
+            return False
+
+    # Articles
+    def _articles_by_issue(self, issue_id: int) -> List[Article]:
+        rows = self._select(Config.ARTICLES_TABLE, 't.issue_id = %s', 'ORDER BY t.created_at DESC', (issue_id,),
+                            row="to_jsonb(t) - 'content'")
+        return Article.from_rows(rows, defer=True, loader=self.loader)
+
+    def get_article_by_id(self, article_id: int) -> Optional[Article]:
+        """Get a specific article by ID"""
+        try:
+            row = self._select_one(Config.ARTICLES_TABLE, article_id)
+            return Article.from_row(row) if row else None
+        except Exception as e:
+            print(f"Error fetching article {article_id}: {e}")
+            return None
+
+    def create_article(self, article_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new article"""
+        try:
+            article = self._insert(Config.ARTICLES_TABLE, article_data)
+            if article:
+                self._invalidate(Config.ARTICLES_TABLE, article)
+            return article
+        except Exception as e:
+            print(f"Error creating article: {e}")
+            return None
+
+    # Photos
+    def _photos_by_issue(self, issue_id: int) -> List[Photo]:
+        return Photo.from_rows(self._select(Config.PHOTOS_TABLE, 't.issue_id = %s', 'ORDER BY t.created_at DESC', (issue_id,)))
+
+    def get_gallery_images(self) -> List[Dict[str, Any]]:
+        """Get all gallery images for carousel display"""
+        try:
+            rows = self._select(Config.PHOTOS_TABLE, 't.issue_id IS NULL', 'ORDER BY t.created_at DESC, t.id DESC')
+            return [self._gallery_image(photo) for photo in rows]
+        except Exception as e:
+            print(f"Error fetching gallery images: {e}")
+            return []
+
+    def get_gallery_page(self, limit: int, cursor: str = None) -> Optional[Dict[str, Any]]:
+        """Get one page of gallery images, newest first, starting after cursor"""
+        try:
+            where = 'issue_id IS NULL'
+            params = []
+            if cursor:
+                created_at, photo_id = decode_cursor(cursor)
+                where += ' AND (created_at, id) < (%s::timestamptz, %s)'
+                params = [created_at, photo_id]
+            # Fetch one extra row to learn whether another page exists
+            query = sql.SQL("SELECT to_json(p) FROM (SELECT id, file_url, filename, caption, alt_text, created_at "
+                            "FROM {table} WHERE {where} ORDER BY created_at DESC, id DESC LIMIT %s) p "
+                            "ORDER BY p.created_at DESC, p.id DESC").format(
+                table=sql.Identifier(Config.PHOTOS_TABLE), where=sql.SQL(where))
+            rows = self._query(query, params + [limit + 1])
+            photos = rows[:limit]
+            next_cursor = None
+            if len(rows) > limit:
+                next_cursor = encode_cursor(photos[-1]['created_at'], photos[-1]['id'])
+            return {'images': [self._gallery_image(photo) for photo in photos], 'next_cursor': next_cursor}
+        except Exception as e:
+            print(f"Error fetching gallery page: {e}")
+            return None
+
+    def add_gallery_image(self, file_url: str, filename: str, caption: str = None, alt_text: str = None) -> Optional[Dict[str, Any]]:
+        """Add a new gallery image to the carousel"""
+        try:
+            photo = self._insert(Config.PHOTOS_TABLE, {
+                'file_url': file_url,
+                'filename': filename,
+                'caption': caption,
+                'alt_text': alt_text,
+                'issue_id': None  # Gallery images are not tied to specific issues
+            })
+            if photo:
+                self._invalidate(Config.PHOTOS_TABLE, photo)
+            return photo
+        except Exception as e:
+            print(f"Error adding gallery image: {e}")
+            return None
+
+    def update_gallery_image(self, file_url: str, caption: str = None, alt_text: str = None) -> bool:
+        """Update an existing gallery image"""
+        try:
+            update_data = {}
+            if caption is not None:
+                update_data['caption'] = caption
+            if alt_text is not None:
+                update_data['alt_text'] = alt_text
+
+            if not update_data:
+                return False
+
+            rows = self._update(Config.PHOTOS_TABLE, update_data, {'file_url': file_url, 'issue_id': None})
+            if rows:
+                self._invalidate(Config.PHOTOS_TABLE, {'issue_id': None})
+            return len(rows) > 0
+        except Exception as e:
+            print(f"Error updating gallery image: {e}")
+            return False
+
+    def delete_gallery_image(self, file_url: str) -> bool:
+        """Delete a gallery image"""
+        try:
+            rows = self._delete(Config.PHOTOS_TABLE, {'file_url': file_url, 'issue_id': None})
+            if rows:
+                self._invalidate(Config.PHOTOS_TABLE, {'issue_id': None})
+            return len(rows) > 0
+        except Exception as e:
+            print(f"Error deleting gallery image: {e}")
+            return False
+
+    def upload_photo(self, photo_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Upload a new photo"""
+        try:
+            photo = self._insert(Config.PHOTOS_TABLE, photo_data)
+            if photo:
+                self._invalidate(Config.PHOTOS_TABLE, photo)
+            return photo
+        except Exception as e:
+            print(f"Error uploading photo: {e}")
+            return None
+
+    # Contributors
+    def _contributors_by_issue(self, issue_id: int) -> Dict[str, List[Contributor]]:
+        rows = self._select(Config.CONTRIBUTORS_TABLE, 't.issue_id = %s', 'ORDER BY t.id', (issue_id,),
+                            row="to_jsonb(t) - 'bio'")
+        return self._group_contributors(rows)
+
+    # Hydrated issues
+    def get_hydrated_issues(self) -> List[Issue]:
+        """Get all issues with their articles, contributors, and photos in one query"""
+        try:
+            def run():
+                query = sql.SQL(HYDRATED_ISSUES_SQL).format(
+                    issues=sql.Identifier(Config.ISSUES_TABLE), articles=sql.Identifier(Config.ARTICLES_TABLE),
+                    contributors=sql.Identifier(Config.CONTRIBUTORS_TABLE), photos=sql.Identifier(Config.PHOTOS_TABLE),
+                    order=sql.SQL(self._date_order(Config.ISSUES_TABLE)))
+                return self._query(query)
+            return [self._hydrate_issue(row) for row in self._with_date_fallback(run)]
+        except Exception as e:
+            print(f"Error fetching hydrated issues: {e}")
+            return []
+
+    # Moments
+    def get_all_moments(self) -> List[Moment]:
+        """Get all moments and milestones"""
+        try:
+            return Moment.from_rows(self._with_date_fallback(
+                lambda: self._select(Config.MOMENTS_TABLE, order=f"ORDER BY {self._date_order(Config.MOMENTS_TABLE)}")))
+        except Exception as e:
+            print(f"Error fetching moments: {e}")
+            return []
+
+    def create_moment(self, moment_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new moment"""
+        try:
+            moment = self._insert(Config.MOMENTS_TABLE, moment_data)
+            if moment:
+                self._invalidate(Config.MOMENTS_TABLE, moment)
+            return moment
+        except Exception as e:
+            print(f"Error creating moment: {e}")
+            return None
+
+    # Editorial Team
+    def get_editorial_team(self, team_type: str = None) -> List[TeamMember]:
+        """Get editorial team members"""
+        try:
+            if team_type:
+                rows = self._select('editorial_team', 't.team_type = %s', 'ORDER BY t.display_order ASC', (team_type,))
+            else:
+                rows = self._select('editorial_team', order='ORDER BY t.display_order ASC')
+            return TeamMember.from_rows(rows)
+        except Exception as e:
+            print(f"Error fetching editorial team: {e}")
+            return []
+
+    def create_team_member(self, member_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new team member"""
+        try:
+            member = self._insert('editorial_team', member_data)
+            if member:
+                self._invalidate('editorial_team', member)
+            return member
+        except Exception as e:
+            print(f"Error creating team member: {e}")
+            return None
+
+    # Awards
+    def get_all_awards(self) -> List[Award]:
+        """Get all awards ordered by year (descending)"""
+        try:
+            return Award.from_rows(self._select('awards', order='ORDER BY t.year DESC', row="to_jsonb(t) - 'award_speech'"), defer=True, loader=self.loader)
+        except Exception as e:
+            print(f"Error fetching awards: {e}")
+            return []
+
+    def get_awards_by_year(self, year: int) -> List[Award]:
+        """Get awards for a specific year"""
+        try:
+            return Award.from_rows(self._select('awards', 't.year = %s', params=(year,), row="to_jsonb(t) - 'award_speech'"), defer=True, loader=self.loader)
+        except Exception as e:
+            print(f"Error fetching awards for year {year}: {e}")
+            return []
+
+    def get_award_by_id(self, award_id: int) -> Optional[Award]:
+        """Get a specific award by ID"""
+        try:
+            row = self._select_one('awards', award_id)
+            return Award.from_row(row) if row else None
+        except Exception as e:
+            print(f"Error fetching award {award_id}: {e}")
+            return None
+
+    def get_awards_years(self) -> List[int]:
+        """Get all years that have awards"""
+        try:
+            years = self._query(sql.SQL("SELECT DISTINCT year FROM {}").format(sql.Identifier('awards')))
+            return sorted(years, reverse=True)
+        except Exception as e:
+            print(f"Error fetching award years: {e}")
+            return []
+
+    def create_award(self, award_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new award"""
+        try:
+            award = self._insert('awards', award_data)
+            if award:
+                self._invalidate('awards', award)
+            return award
+        except Exception as e:
+            print(f"Error creating award: {e}")
+            return None
+
+    # Who's Who
+    def get_all_whos_who(self) -> List[WhosWho]:
+        """Get all who's who entries ordered by name (bios shortened to a preview)"""
+        try:
+            return WhosWho.from_rows(self._select('whos_who', order='ORDER BY t.name', row=WHOS_WHO_LIST_ROW), defer=True, loader=self.loader)
+        except Exception as e:
+            print(f"Error fetching who's who: {e}")
+            return []
+
+    def get_whos_who_by_letter(self, letter: str) -> List[WhosWho]:
+        """Get who's who entries starting with a specific letter"""
+        try:
+            rows = self._select('whos_who', 't.name ILIKE %s', 'ORDER BY t.name', (f'{letter}%',), row=WHOS_WHO_LIST_ROW)
+            return WhosWho.from_rows(rows, defer=True, loader=self.loader)
+        except Exception as e:
+            print(f"Error fetching who's who for letter {letter}: {e}")
+            return []
+
+    def get_whos_who_by_id(self, person_id: int) -> Optional[WhosWho]:
+        """Get a specific who's who entry by ID"""
+        try:
+            row = self._select_one('whos_who', person_id)
+            return WhosWho.from_row(row) if row else None
+        except Exception as e:
+            print(f"Error fetching who's who entry {person_id}: {e}")
+            return None
+
+    def get_whos_who_letters(self) -> List[str]:
+        """Get all first letters that have who's who entries"""
+        try:
+            initials = self._query(sql.SQL("SELECT DISTINCT left(name, 1) FROM {} WHERE name <> ''").format(sql.Identifier('whos_who')))
+            return sorted(set(initial.upper() for initial in initials))
+        except Exception as e:
+            print(f"Error fetching who's who letters: {e}")
+            return []
+
+    def create_whos_who(self, person_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new who's who entry"""
+        try:
+            person = self._insert('whos_who', person_data)
+            if person:
+                self._invalidate('whos_who', person)
+            return person
+        except Exception as e:
+            print(f"Error creating who's who entry: {e}")
+            return None
+
+    # Authors
+    def _author_links(self, values: List[str], split: bool) -> List[Dict[str, str]]:
+        return self._query("SELECT to_json(l) FROM author_links(%s, %s) l", (list(values), split))
+    
+    def _indexed_slugs(self, source_table: Optional[str], ids: List[int]) -> Set[str]:
+        query = "SELECT DISTINCT a.slug FROM author_credits c JOIN authors a ON a.id = c.author_id"
+        if source_table is None:
+            return set(self._query(query + " WHERE c.issue_id = ANY(%s)", (ids,)))
+        return set(self._query(query + " WHERE c.source_table = %s AND c.source_id = ANY(%s)", (source_table, ids)))
+    
+    def get_author_by_slug(self, slug: str) -> Optional[Author]:
+        """Get an author with the articles, contributions, awards and Who's Who entry credited to them"""
+        try:
+            def run():
+                query = sql.SQL(AUTHOR_SQL).format(
+                    issues=sql.Identifier(Config.ISSUES_TABLE), issue_order=sql.SQL(self._date_order(Config.ISSUES_TABLE, 'i')),
+                    articles=sql.Identifier(Config.ARTICLES_TABLE), articles_name=sql.Literal(Config.ARTICLES_TABLE),
+                    contributors=sql.Identifier(Config.CONTRIBUTORS_TABLE), contributors_name=sql.Literal(Config.CONTRIBUTORS_TABLE))
+                return self._query(query, (slug,))
+            rows = self._with_date_fallback(run)
+            return self._build_author(rows[0]) if rows else None
+        except Exception as e:
+            print(f"Error fetching author {slug}: {e}")
+            return None
+
+    # Bulk operations
+    def upsert_rows(self, table: str, rows: List[Dict[str, Any]], on_conflict: str) -> Optional[List[Dict[str, Any]]]:
+        """Insert or update a batch of rows in one statement, matching existing rows on on_conflict"""
+        try:
+            if not rows:
+                return []
+            columns = list(rows[0])
+            conflict = [column.strip() for column in on_conflict.split(',')]
+            updates = [column for column in columns if column not in conflict]
+            if updates:
+                action = sql.SQL("DO UPDATE SET {}").format(sql.SQL(', ').join(
+                    sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in updates))
+            else:
+                action = sql.SQL("DO NOTHING")
+            query = sql.SQL("WITH t AS (INSERT INTO {table} ({columns}) "
+                            "SELECT {columns} FROM json_populate_recordset(NULL::{table}, %s) "
+                            "ON CONFLICT ({conflict}) {action} RETURNING *) SELECT to_json(t) FROM t").format(
+                table=sql.Identifier(table), columns=self._columns(columns),
+                conflict=self._columns(conflict), action=action)
+            authors = self._credited_before_upsert(table, rows)
+            stored = self._query(query, [Json(rows)], prepare=False)
+            self._invalidate_rows(table, stored, authors)
+            return stored
+        except Exception as e:
+            print(f"Error upserting {len(rows)} rows into {table}: {e}")
+            return None
+
+    def iter_rows(self, table: str, batch_size: int = 500):
+        """Yield every row of a table in id order, fetching one batch at a time"""
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = self._select(table, order='ORDER BY t.id LIMIT %s', params=(batch_size,))
+            else:
+                rows = self._select(table, 't.id > %s', 'ORDER BY t.id LIMIT %s', (last_id, batch_size))
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+
+    # Deferred fields
+    def load_fields(self, table: str, ids: List[Any], fields: List[str], batch_size: int = 200) -> Optional[List[Dict[str, Any]]]:
+        """Get some columns of many rows by id, a batch of ids per query (None on failure)"""
+        try:
+            query = sql.SQL("SELECT to_json(s) FROM (SELECT {columns} FROM {table} WHERE id = ANY(%s)) s").format(
+                columns=self._columns(['id', *fields]), table=sql.Identifier(table))
+            rows = []
+            for start in range(0, len(ids), batch_size):
+                rows.extend(self._query(query, (ids[start:start + batch_size],)))
+            return rows
+        except Exception as e:
+            print(f"Error fetching {', '.join(fields)} from {table}: {e}")
+            return None
+
+    # Change tracking
+    def get_row_stamps(self, table: str, columns: str = 'id, updated_at') -> Optional[List[Dict[str, Any]]]:
+        """Get the update timestamp of every row in a table (None if unavailable)"""
+        try:
+            query = sql.SQL("SELECT to_json(s) FROM (SELECT {columns} FROM {table}) s").format(
+                columns=self._columns(column.strip() for column in columns.split(',')), table=sql.Identifier(table))
+            return self._query(query)
+        except Exception as e:
+            print(f"Error fetching change stamps for {table}: {e}")
+            return None
@@ -0,0 +1,280 @@
+"""
+Rate limiting and load shedding for the form endpoints.
+
+/contact and /subscribe send email synchronously, so a flood of submissions
+can tie up every gunicorn worker. FormLimiter checks each submission:
+
+1. Load shedding: reject with 503 when the request already waited too long in
+   the router queue (Heroku's X-Request-Start header) or when too many form
+   submissions are being processed at once. Shed requests use up no tokens.
+2. Token buckets: reject with 429 when the client IP, or the site as a whole,
+   has used up its submission budget.
+
+Buckets, in-flight counts and counters live in this process by default. Set
+RATE_LIMIT_REDIS_URL to share them across workers (needs the redis package).
+
+The in-flight limit counts submissions running at the same time, so it only
+does something when they can overlap. A default gunicorn sync worker (the
+Procfile's ``gunicorn app:app``) handles one request at a time, and its
+in-process count never passes 1. Run threaded or gevent workers
+(``gunicorn --threads 8 app:app`` or ``-k gevent``), or several workers with
+RATE_LIMIT_REDIS_URL set, for FORM_MAX_IN_FLIGHT to take effect.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+COUNTERS = ('allowed', 'limited_ip', 'limited_global', 'shed_queue', 'shed_in_flight')
+
+
+class TokenBucket:
+    """Allows bursts of up to capacity, refilled at rate tokens per second"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> Tuple[bool, float]:
+        """Take one token, returning (allowed, seconds until a token is available)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class MemoryStore:
+    """Limiter state kept in this worker process"""
+
+    # Clients tracked at most; the least recently seen are dropped beyond this
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        # Least recently used first
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._in_flight: Dict[str, int] = {}
+        self._counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[key] = TokenBucket(capacity, rate, now)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(now)
+
+    def refund(self, key: str):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.tokens = min(bucket.capacity, bucket.tokens + 1)
+
+    def _prune(self, now: float):
+        """Make room for new buckets, keeping memory bounded however many clients appear
+
+        Buckets that have refilled completely go first, since a new bucket
+        starts full anyway. If that is not enough (a flood of distinct IPs),
+        the least recently used buckets are dropped until a tenth of the
+        capacity is free.
+        """
+        for key, bucket in list(self._buckets.items()):
+            if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.capacity:
+                del self._buckets[key]
+        while len(self._buckets) > self.MAX_BUCKETS * 9 // 10:
+            self._buckets.popitem(last=False)
+
+    def acquire(self, key: str, limit: int) -> bool:
+        with self._lock:
+            if self._in_flight.get(key, 0) >= limit:
+                return False
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+            return True
+
+    def release(self, key: str):
+        with self._lock:
+            self._in_flight[key] = max(0, self._in_flight.get(key, 0) - 1)
+
+    def incr(self, counter: str):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_flight'] = sum(self._in_flight.values())
+            stats['tracked_clients'] = len(self._buckets)
+            return stats
+
+
+class RedisStore:
+    """Limiter state shared by every worker through Redis"""
+
+    PREFIX = 'ratelimit:'
+
+    # Refill and take in one atomic step
+    TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now), 'capacity', tostring(capacity))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+    # In-flight counts expire so a crashed worker cannot leak them forever
+    IN_FLIGHT_TTL = 60
+
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._redis.ping()
+        self._take = self._redis.register_script(self.TAKE_SCRIPT)
+        self._refund = self._redis.register_script(self.REFUND_SCRIPT)
+
+    # Give back a token taken by a request that was then rejected elsewhere
+    REFUND_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'capacity')
+if state[1] and state[2] then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(state[2]), tonumber(state[1]) + 1)))
+end
+"""
+
+    def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._take(keys=[self.PREFIX + 'bucket:' + key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(retry_after)
+
+    def refund(self, key: str):
+        self._refund(keys=[self.PREFIX + 'bucket:' + key])
+
+    def acquire(self, key: str, limit: int) -> bool:
+        redis_key = self.PREFIX + 'in_flight:' + key
+        pipe = self._redis.pipeline()
+        pipe.incr(redis_key)
+        pipe.expire(redis_key, self.IN_FLIGHT_TTL)
+        count = pipe.execute()[0]
+        if count > limit:
+            self._redis.decr(redis_key)
+            return False
+        return True
+
+    def release(self, key: str):
+        self._redis.decr(self.PREFIX + 'in_flight:' + key)
+
+    def incr(self, counter: str):
+        self._redis.hincrby(self.PREFIX + 'counters', counter, 1)
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict.fromkeys(COUNTERS, 0)
+        stats.update({key.decode(): int(value) for key, value in self._redis.hgetall(self.PREFIX + 'counters').items()})
+        stats['in_flight'] = sum(int(self._redis.get(key) or 0) for key in self._redis.scan_iter(self.PREFIX + 'in_flight:*'))
+        return stats
+
+
+class Decision:
+    """Outcome of a limiter check"""
+
+    __slots__ = ('allowed', 'status', 'reason', 'retry_after')
+
+    def __init__(self, allowed: bool, status: int = 200, reason: str = None, retry_after: float = 0):
+        self.allowed = allowed
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class FormLimiter:
+    """Per-IP and global token buckets plus load shedding for one group of endpoints"""
+
+    def __init__(self, store, name: str, per_ip: Tuple[float, float], global_: Tuple[float, float],
+                 max_in_flight: int, max_queue_ms: int):
+        self.store = store
+        self.name = name
+        self.per_ip = per_ip
+        self.global_ = global_
+        self.max_in_flight = max_in_flight
+        self.max_queue_ms = max_queue_ms
+
+    def check(self, client_ip: str, request_start: Optional[str] = None) -> Decision:
+        """Decide whether a submission may proceed; on success, release() must follow"""
+        # Shed load before touching the buckets, so a request turned away
+        # because the server is busy does not use up the client's budget
+        queue_ms = self._queue_ms(request_start)
+        if queue_ms is not None and queue_ms > self.max_queue_ms:
+            self.store.incr('shed_queue')
+            return Decision(False, 503, 'Server busy', 5)
+
+        if not self.store.acquire(self.name, self.max_in_flight):
+            self.store.incr('shed_in_flight')
+            return Decision(False, 503, 'Server busy', 5)
+
+        ip_key = f"{self.name}:ip:{client_ip}"
+        allowed, retry_after = self.store.take(ip_key, *self.per_ip)
+        if not allowed:
+            self.store.release(self.name)
+            self.store.incr('limited_ip')
+            return Decision(False, 429, 'Too many requests', retry_after)
+
+        allowed, retry_after = self.store.take(f"{self.name}:global", *self.global_)
+        if not allowed:
+            # The submission never ran, so it doesn't count against the client
+            self.store.refund(ip_key)
+            self.store.release(self.name)
+            self.store.incr('limited_global')
+            return Decision(False, 429, 'Too many requests', retry_after)
+
+        self.store.incr('allowed')
+        return Decision(True)
+
+    def release(self):
+        self.store.release(self.name)
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
+    @staticmethod
+    def _queue_ms(request_start: Optional[str]) -> Optional[float]:
+        """Time spent waiting in the router, from X-Request-Start (ms or 't=' µs since epoch)"""
+        if not request_start:
+            return None
+        try:
+            value = float(request_start.strip().lstrip('t='))
+        except ValueError:
+            return None
+        # Some proxies send microseconds, Heroku sends milliseconds
+        start_ms = value / 1000 if value > 1e14 else value
+        return max(0.0, time.time() * 1000 - start_ms)
+
+
+def create_store(redis_url: Optional[str] = None):
+    """Use Redis when configured and reachable, otherwise this process's memory"""
+    if redis_url:
+        try:
+            return RedisStore(redis_url)
+        except Exception as e:
+            print(f"Rate limit store error: {e}")
+            print("Rate limiting will use per-process memory instead.")
+    return MemoryStore()
@@ -971,9 +971,96 @@ document.addEventListener('DOMContentLoaded', function() {
 // ========================================
 
 let currentGalleryIndex = 0;
-const galleryCards = document.querySelectorAll('.gallery-card');
-const galleryDots = document.querySelectorAll('.gallery-dot');
-const totalImages = galleryCards.length;
+let galleryCards = document.querySelectorAll('.gallery-card');
+let galleryDots = document.querySelectorAll('.gallery-dot');
+let totalImages = galleryCards.length;
+
+// Progressive loading: only the first page of images comes with the page,
+// later pages are fetched from the gallery API as the visitor advances
+const galleryWrapper = document.querySelector('.gallery-wrapper');
+let galleryNextCursor = galleryWrapper ? galleryWrapper.dataset.nextCursor : '';
+let galleryLoading = false;
+const GALLERY_PRELOAD_DISTANCE = 2;
+
+function refreshGalleryElements() {
+    galleryCards = document.querySelectorAll('.gallery-card');
+    galleryDots = document.querySelectorAll('.gallery-dot');
+    totalImages = galleryCards.length;
+}
+
+function createGalleryCard(image, index) {
+    const card = document.createElement('div');
+    card.className = 'gallery-card hidden';
+    card.dataset.index = index;
+
+    const cardImage = document.createElement('div');
+    cardImage.className = 'card-image';
+
+    const img = document.createElement('img');
+    img.src = image.photo_url;
+    img.alt = image.caption || 'Gallery Image';
+    img.className = 'gallery-img';
+    cardImage.appendChild(img);
+
+    const overlay = document.createElement('div');
+    overlay.className = 'card-overlay';
+    const content = document.createElement('div');
+    content.className = 'card-content';
+    const title = document.createElement('h3');
+    title.textContent = image.caption || 'Gallery Image';
+    content.appendChild(title);
+    if (image.description) {
+        const description = document.createElement('p');
+        description.textContent = image.description;
+        content.appendChild(description);
+    }
+    overlay.appendChild(content);
+    cardImage.appendChild(overlay);
+    card.appendChild(cardImage);
+    return card;
+}
+
+function createGalleryDot(index) {
+    const dot = document.createElement('span');
+    dot.className = 'gallery-dot';
+    dot.addEventListener('click', () => goToGallerySlide(index));
+    return dot;
+}
+
+// Fetch the next page when the visitor gets close to the last loaded image
+function preloadGalleryImages() {
+    if (!galleryWrapper || !galleryNextCursor || galleryLoading) return;
+    if (totalImages - 1 - currentGalleryIndex > GALLERY_PRELOAD_DISTANCE) return;
+
+    galleryLoading = true;
+    const url = `${galleryWrapper.dataset.galleryApi}?cursor=${encodeURIComponent(galleryNextCursor)}`;
+    fetch(url)
+        .then(response => {
+            if (!response.ok) throw new Error(`Gallery request failed: ${response.status}`);
+            return response.json();
+        })
+        .then(page => {
+            const dotsContainer = document.querySelector('.gallery-dots');
+            page.images.forEach((image, offset) => {
+                const index = totalImages + offset;
+                const card = createGalleryCard(image, index);
+                setupGalleryCardClick(card);
+                galleryWrapper.appendChild(card);
+                if (dotsContainer) dotsContainer.appendChild(createGalleryDot(index));
+            });
+            galleryNextCursor = page.next_cursor || '';
+            refreshGalleryElements();
+            updateGalleryCards();
+        })
+        .catch(error => {
+            // Keep cycling through the images already loaded
+            console.error(error);
+            galleryNextCursor = '';
+        })
+        .finally(() => {
+            galleryLoading = false;
+        });
+}
 
 function updateGalleryCards() {
     galleryCards.forEach((card, index) => {
@@ -1012,12 +1099,14 @@ function changeGallerySlide(direction) {
     }
     
     updateGalleryCards();
+    preloadGalleryImages();
 }
 
 function goToGallerySlide(index) {
     if (index >= 0 && index < totalImages) {
         currentGalleryIndex = index;
         updateGalleryCards();
+        preloadGalleryImages();
     }
 }
 
@@ -1055,25 +1144,29 @@ function handleSwipeGesture() {
 }
 
 // Click handlers for side cards
-function setupGalleryCardClicks() {
-    galleryCards.forEach(card => {
-        card.addEventListener('click', function() {
-            const cardIndex = parseInt(this.dataset.index);
-            const relativeIndex = (cardIndex - currentGalleryIndex + totalImages) % totalImages;
-            
-            if (relativeIndex === 1 || relativeIndex === totalImages - 1) {
-                // Clicked on side card - make it main
-                currentGalleryIndex = cardIndex;
-                updateGalleryCards();
-            }
-        });
+function setupGalleryCardClick(card) {
+    card.addEventListener('click', function() {
+        const cardIndex = parseInt(this.dataset.index);
+        const relativeIndex = (cardIndex - currentGalleryIndex + totalImages) % totalImages;
+        
+        if (relativeIndex === 1 || relativeIndex === totalImages - 1) {
+            // Clicked on side card - make it main
+            currentGalleryIndex = cardIndex;
+            updateGalleryCards();
+            preloadGalleryImages();
+        }
     });
 }
 
+function setupGalleryCardClicks() {
+    galleryCards.forEach(setupGalleryCardClick);
+}
+
 // Auto-play carousel
 let galleryAutoPlayInterval;
 
 function startGalleryCarousel() {
+    stopGalleryCarousel();
     if (totalImages > 1) {
         galleryAutoPlayInterval = setInterval(() => {
             changeGallerySlide(1);
@@ -1094,6 +1187,7 @@ document.addEventListener('DOMContentLoaded', function() {
         setupGalleryCardClicks();
         handleGallerySwipe();
         startGalleryCarousel();
+        preloadGalleryImages();
         
         // Pause auto-play on hover
         const galleryContainer = document.querySelector('.gallery-container');
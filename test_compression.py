@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Test script to verify page streaming and response compression
+
+Runs without a database:
+- Accept-Encoding negotiation: q-values, refused codings, brotli/gzip preference
+- responses the middleware must leave alone (already encoded, HEAD, 304,
+  no-transform, small or non-text bodies)
+- streamed responses decode to the full page, with the head in the first
+  chunk and few flushes after it
+- the issue and Mapao pages send their head before the database is queried
+- a page that fails part-way is logged and never cached
+
+It also reports time to first byte and transfer size for a large issue page
+whose article text takes a while to load.
+"""
+
+import contextlib
+import gzip
+import io
+import random
+import sys
+import time
+import zlib
+
+from werkzeug.test import Client
+
+import app as app_module
+from cache import content_cache, page_key
+from compression import CompressionMiddleware, negotiate_encoding
+from models import Article
+from test_cache import Checker, FakeDatabase
+
+ARTICLES = 40
+LOAD_DELAY = 0.3
+PARAGRAPH = ("The lake wakes slowly under a veil of mist, and the fishermen push their boats out "
+             "between the floating phumdis while the hills stay dark behind them.\n\n")
+WORDS = PARAGRAPH.split() + ['monsoon', 'Imphal', 'market', 'grandmother', 'river', 'paddy', 'festival',
+                             'songs', 'evening', 'smoke', 'letters', 'border', 'memory', 'silence']
+
+
+class SlowDatabase(FakeDatabase):
+    """One large issue whose article text takes LOAD_DELAY seconds to fetch"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+        self.issue_calls = 0
+        self.text_loads = 0
+        self.loader = self.load_fields
+
+    def get_all_issues(self):
+        self.issue_calls += 1
+        return super().get_all_issues()
+
+    def get_issue_details(self, issue_id):
+        details = super().get_issue_details(issue_id)
+        details['featured_articles'] = Article.from_rows(
+            [{'id': n, 'issue_id': issue_id, 'title': f"Article {n}", 'author': f"Author {n % 7}",
+              'category': ('Poetry', 'Essay', 'Short Story')[n % 3], 'content': self.text(n)}
+             for n in range(1, ARTICLES + 1)], defer=True, loader=self.loader)
+        return details
+
+    def load_fields(self, table, ids, fields):
+        self.text_loads += 1
+        time.sleep(LOAD_DELAY)
+        return [{'id': row_id, 'content': self.text(row_id)} for row_id in ids]
+
+    @staticmethod
+    def text(n):
+        """About 12 KB of prose, different for every article"""
+        words = random.Random(n).choices(WORDS, k=2000)
+        paragraphs = [' '.join(words[start:start + 80]) + '.' for start in range(0, len(words), 80)]
+        return f"Article {n}\n\n" + '\n\n'.join(paragraphs)
+
+
+def wsgi_app(body, status='200 OK', headers=(('Content-Type', 'text/html; charset=utf-8'),)):
+    """A WSGI app returning body with its Content-Length"""
+    def application(environ, start_response):
+        start_response(status, list(headers) + [('Content-Length', str(len(body)))])
+        return [body]
+    return application
+
+
+def check_negotiation(check):
+    cases = [
+        ('gzip, deflate, br', True, 'br'),
+        ('gzip, deflate, br', False, 'gzip'),
+        ('br;q=0.5, gzip;q=0.8', True, 'gzip'),
+        ('br;q=0.8, gzip;q=0.5', True, 'br'),
+        ('GZIP', True, 'gzip'),
+        ('gzip;q=0', True, None),
+        ('deflate', True, None),
+        ('', True, None),
+        ('*', True, 'br'),
+        ('*', False, 'gzip'),
+        ('*;q=0.5, gzip;q=0', False, None),
+        ('*;q=0.5, gzip;q=0', True, 'br'),
+        ('identity;q=0', True, 'gzip'),
+        ('identity;q=0, gzip;q=0', True, None),
+        ('gzip;q=1.0, identity; q=0.5, *;q=0', True, 'gzip'),
+        ('br;q=oops, gzip', True, 'gzip'),
+    ]
+    for header, brotli_available, expected in cases:
+        result = negotiate_encoding(header, brotli_available)
+        check(f"{header or '(empty)'!r}{'' if brotli_available else ' without brotli'} -> {expected}",
+              result == expected, result)
+
+
+def check_skipped(check):
+    page = b'<html>' + b'x' * 2000 + b'</html>'
+    headers = {'Accept-Encoding': 'gzip'}
+
+    encoded = gzip.compress(page)
+    client = Client(CompressionMiddleware(wsgi_app(encoded, headers=(('Content-Type', 'text/html'),
+                                                                      ('Content-Encoding', 'gzip')))))
+    response = client.get('/', headers=headers)
+    check("Already-encoded response passed through", response.get_data() == encoded
+          and response.headers.getlist('Content-Encoding') == ['gzip'], response.headers.getlist('Content-Encoding'))
+
+    client = Client(CompressionMiddleware(wsgi_app(page)))
+    response = client.head('/', headers=headers)
+    check("HEAD not compressed", 'Content-Encoding' not in response.headers)
+
+    client = Client(CompressionMiddleware(wsgi_app(b'', status='304 Not Modified')))
+    response = client.get('/', headers=headers)
+    check("304 not compressed", 'Content-Encoding' not in response.headers)
+
+    client = Client(CompressionMiddleware(wsgi_app(page, headers=(('Content-Type', 'text/html'),
+                                                                  ('Cache-Control', 'public, no-transform')))))
+    check("no-transform respected", 'Content-Encoding' not in client.get('/', headers=headers).headers)
+
+    client = Client(CompressionMiddleware(wsgi_app(b'<p>small</p>')))
+    response = client.get('/', headers=headers)
+    check("Small response not compressed", 'Content-Encoding' not in response.headers
+          and response.headers.get('Vary') == 'Accept-Encoding', dict(response.headers))
+
+    client = Client(CompressionMiddleware(wsgi_app(page, headers=(('Content-Type', 'image/png'),))))
+    response = client.get('/', headers=headers)
+    check("Images not compressed and not varied", 'Content-Encoding' not in response.headers
+          and 'Vary' not in response.headers, dict(response.headers))
+
+    client = Client(CompressionMiddleware(wsgi_app(page, headers=(('Content-Type', 'text/html'),
+                                                                  ('ETag', '"abc"'), ('Vary', 'Cookie')))))
+    response = client.get('/', headers=headers)
+    check("Compressed response decodes to the original", gzip.decompress(response.get_data()) == page)
+    check("Compressed response headers updated",
+          (response.headers.get('ETag'), response.headers.get('Vary'), response.headers.get('Content-Length'))
+          == ('W/"abc"', 'Cookie, Accept-Encoding', None), dict(response.headers))
+
+
+def check_streamed(check):
+    head = b'<html><head><title>Issue</title></head>'
+    body = head + b''.join(b'<p>%d %s</p>' % (n, PARAGRAPH.encode()) for n in range(200)) + b'</html>'
+    chunks = [head] + [body[n:n + 100] for n in range(len(head), len(body), 100)]
+
+    def application(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/html')])
+        return iter(chunks)
+
+    middleware = CompressionMiddleware(application)
+    environ = {'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': 'gzip'}
+    output = [data for data in middleware(environ, lambda status, headers, exc_info=None: None)]
+    decompressor = zlib.decompressobj(31)
+    check("First chunk carries the whole head", decompressor.decompress(output[0]) == head)
+    rest = b''.join(decompressor.decompress(data) for data in output[1:])
+    check("Streamed response decodes to the full page", head + rest == body)
+    limit = 2 + len(body) // middleware.flush_size
+    check(f"Small chunks buffered into at most {limit} flushes", len(output) <= limit,
+          f"{len(output)} outputs for {len(chunks)} chunks")
+
+
+@contextlib.contextmanager
+def database(fake):
+    get_db_service = app_module.get_db_service
+    app_module.get_db_service = lambda: fake
+    content_cache.clear()
+    try:
+        yield
+    finally:
+        app_module.get_db_service = get_db_service
+        content_cache.clear()
+
+
+def fetch(client, path, encoding):
+    """Request a page, timing its first and last chunk and counting the bytes sent"""
+    started = time.perf_counter()
+    response = client.get(path, headers={'Accept-Encoding': encoding})
+    chunks = iter(response.response)
+    first = next(chunks)
+    first_at = time.perf_counter() - started
+    data = first + b''.join(chunks)
+    response.close()
+    return first, data, first_at, time.perf_counter() - started
+
+
+def check_issue_page(check):
+    fake = SlowDatabase()
+    client = app_module.app.test_client(use_cookies=False)
+    with database(fake):
+        # Warm the issue list, details and templates so only the article text is slow
+        fetch(client, '/issue/1', 'identity')
+        content_cache.delete([page_key('/issue/1')])
+        fake.text_loads = 0
+        first, page, first_at, total = fetch(client, '/issue/1', 'identity')
+        check("Issue page head sent before the article text loads",
+              b'</head>' in first and b'Article 1\n' not in first and first_at < LOAD_DELAY,
+              f"first chunk after {first_at * 1000:.0f} ms")
+        check("Article text loaded in one query after the head", fake.text_loads == 1 and total >= LOAD_DELAY,
+              fake.text_loads)
+        check("Streamed page cached once complete", content_cache.get(page_key('/issue/1')) == page.decode())
+
+        content_cache.delete([page_key('/issue/1')])
+        compressed_first, compressed, compressed_first_at, compressed_total = fetch(client, '/issue/1', 'gzip')
+        decompressor = zlib.decompressobj(31)
+        check("Compressed first chunk decodes to the head", b'</head>' in decompressor.decompress(compressed_first))
+        check("Compressed page decodes to the same HTML", zlib.decompress(compressed, 31) == page)
+
+        print(f"ℹ️  Issue page with {ARTICLES} articles, text loading for {LOAD_DELAY * 1000:.0f} ms:")
+        print(f"   identity: {len(page) / 1024:.1f} KB, first byte {first_at * 1000:.0f} ms, "
+              f"last byte {total * 1000:.0f} ms")
+        print(f"   gzip:     {len(compressed) / 1024:.1f} KB, first byte {compressed_first_at * 1000:.0f} ms, "
+              f"last byte {compressed_total * 1000:.0f} ms")
+
+
+def check_mapao_page(check):
+    fake = SlowDatabase()
+    client = app_module.app.test_client(use_cookies=False)
+    with database(fake):
+        response = client.get('/mapao')
+        chunks = iter(response.response)
+        first = next(chunks)
+        check("Mapao head sent before the issues are queried", b'</head>' in first and fake.issue_calls == 0,
+              fake.issue_calls)
+        page = first + b''.join(chunks)
+        response.close()
+        check("Mapao page shows the latest issue", b'Spring 2024' in page and fake.issue_calls == 1)
+
+
+def check_failed_render(check):
+    fake = SlowDatabase()
+
+    def fail():
+        raise RuntimeError('database went away')
+
+    view = app_module.cached_page(lambda: app_module.stream_page('mapao.html', load=fail, issues=[]))
+    with database(fake), app_module.app.test_request_context('/broken'):
+        response = view()
+        chunks = iter(response.response)
+        check("Head still sent before the failure", '</head>' in next(chunks))
+        log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+                list(chunks)
+            check("Failure cuts the response short", False)
+        except RuntimeError:
+            check("Failure cuts the response short", True)
+        check("Failure logged with a traceback", 'Error streaming mapao.html' in log.getvalue()
+              and 'Traceback' in log.getvalue(), log.getvalue())
+        check("Partial page not cached", content_cache.get(page_key('/broken')) is None)
+
+
+def test_compression():
+    """Run every streaming and compression check"""
+    checker = Checker()
+
+    print("🔍 Testing Accept-Encoding negotiation...")
+    check_negotiation(checker.check)
+
+    print("\n🔍 Testing responses left uncompressed...")
+    check_skipped(checker.check)
+
+    print("\n🔍 Testing streamed compression...")
+    check_streamed(checker.check)
+
+    print("\n🔍 Testing the streamed issue page...")
+    check_issue_page(checker.check)
+
+    print("\n🔍 Testing the streamed Mapao page...")
+    check_mapao_page(checker.check)
+
+    print("\n🔍 Testing a page that fails while streaming...")
+    check_failed_render(checker.check)
+
+    return checker.failures == 0
+
+
+if __name__ == "__main__":
+    success = test_compression()
+
+    if success:
+        print("\n🎉 Streaming and compression are working!")
+    else:
+        print("\n💡 Some streaming or compression checks failed. See the output above.")
+    sys.exit(0 if success else 1)
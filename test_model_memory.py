@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Test script to measure the memory the content cache holds for the issue catalogue
+
+Builds a synthetic catalogue of 1,000 issues (articles, contributors and photos
+for each, decoded from JSON the way PostgREST responses are) and measures with
+tracemalloc what the cached 'issues' list and per-issue details retain:
+
+- as plain dicts, the way DatabaseService returned them before models.py
+- as models with every column loaded
+- as models the way list queries build them, with large text deferred
+
+The rendered issue pages in the page cache hold every article's text whatever
+the rows look like, so it then renders each issue page through the app and
+reports the totals with those pages cached too.
+"""
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import app as app_module
+from cache import content_cache
+from models import Issue, Article, Contributor, Photo
+
+ISSUES = 1000
+ARTICLES_PER_ISSUE = 12
+CONTRIBUTORS_PER_ISSUE = 6
+PHOTOS_PER_ISSUE = 8
+
+AUTHORS = [f"Author {n}" for n in range(300)]
+CATEGORIES = ['Poetry', 'Short Story', 'Essay', 'Translation', 'Review', 'Interview']
+ROLES = [('Editor', 'editorial_team'), ('Poet', 'featured_writers'), ('Writer', 'featured_writers'),
+         ('Photographer', 'photographers')]
+
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(['thoiba', 'loktak', 'leirang', 'nongjabi', 'ima', 'khongjom', 'sana'])
+                    for _ in range(words))
+
+
+def synthetic_payloads():
+    """JSON text per issue, as it would arrive from the API"""
+    rng = random.Random(42)
+    payloads = []
+    for issue_id in range(1, ISSUES + 1):
+        issue = {
+            'id': issue_id, 'title': f"Mapao Issue {issue_id}", 'description': paragraph(rng, 40),
+            'release_date': f"{rng.choice(['March', 'September'])} {1990 + issue_id % 35}",
+            'release_on': f"{1990 + issue_id % 35}-03-01", 'journal_type': rng.choice(['literary', 'research']),
+            'editorial': paragraph(rng, 300), 'cover_image_url': f"https://example.com/covers/{issue_id}.jpg",
+            'pdf_url': f"https://example.com/pdf/{issue_id}.pdf", 'is_latest_issue': False,
+            'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': '2024-01-01T00:00:00+00:00',
+        }
+        articles = [{
+            'id': issue_id * 100 + n, 'issue_id': issue_id, 'title': f"Article {issue_id}-{n}",
+            'content': paragraph(rng, 500), 'author': rng.choice(AUTHORS), 'category': rng.choice(CATEGORIES),
+            'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': '2024-01-01T00:00:00+00:00',
+        } for n in range(ARTICLES_PER_ISSUE)]
+        contributors = []
+        for n in range(CONTRIBUTORS_PER_ISSUE):
+            role, role_type = rng.choice(ROLES)
+            contributors.append({
+                'id': issue_id * 100 + n, 'issue_id': issue_id, 'name': rng.choice(AUTHORS), 'role': role,
+                'role_type': role_type, 'photo_url': None, 'bio': paragraph(rng, 100),
+                'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': '2024-01-01T00:00:00+00:00',
+            })
+        photos = [{
+            'id': issue_id * 100 + n, 'issue_id': issue_id, 'filename': f"photo{n}.jpg", 'caption': paragraph(rng, 8),
+            'alt_text': paragraph(rng, 6), 'file_url': f"https://example.com/issues/{issue_id}/photo{n}.jpg",
+            'file_size': rng.randint(10000, 900000), 'mime_type': 'image/jpeg',
+            'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': '2024-01-01T00:00:00+00:00',
+        } for n in range(PHOTOS_PER_ISSUE)]
+        payloads.append((json.dumps(issue), json.dumps(articles), json.dumps(contributors), json.dumps(photos)))
+    return payloads
+
+
+def group_contributors(rows, convert):
+    contributors = {'editorial_team': [], 'featured_writers': [], 'photographers': []}
+    for row in rows:
+        role_type = row.get('role_type', 'featured_writers')
+        if role_type in contributors:
+            contributors[role_type].append(convert(row))
+    return contributors
+
+
+def build_dicts(payloads):
+    issues = []
+    details = {}
+    for issue_json, articles_json, contributors_json, photos_json in payloads:
+        issue = json.loads(issue_json)
+        issues.append(issue)
+        details[f"issue:{issue['id']}"] = {
+            'featured_articles': json.loads(articles_json),
+            'contributors': group_contributors(json.loads(contributors_json), dict),
+            'gallery': json.loads(photos_json),
+        }
+    return issues, details
+
+
+def build_models(payloads, defer, loader=None):
+    issues = []
+    details = {}
+    for issue_json, articles_json, contributors_json, photos_json in payloads:
+        issue = Issue.from_row(json.loads(issue_json))
+        issues.append(issue)
+        details[f"issue:{issue.id}"] = {
+            'featured_articles': Article.from_rows(json.loads(articles_json), defer=defer, loader=loader),
+            'contributors': group_contributors(json.loads(contributors_json),
+                                               lambda row: Contributor.from_row(row, defer=defer, loader=loader)),
+            'gallery': Photo.from_rows(json.loads(photos_json)),
+        }
+    return issues, details
+
+
+class CatalogueDatabase:
+    """Serves the synthetic catalogue to the app, with text deferred, so its pages can be rendered"""
+
+    def __init__(self, payloads):
+        self.loader = self.load_fields
+        self.issues, self.details = build_models(payloads, defer=True, loader=self.loader)
+        self.rows = {}
+        for _, articles_json, contributors_json, _ in payloads:
+            for table, rows_json in ((Article._table, articles_json), (Contributor._table, contributors_json)):
+                for row in json.loads(rows_json):
+                    self.rows[(table, row['id'])] = row
+
+    def get_all_issues(self):
+        return self.issues
+
+    def get_issue_details(self, issue_id):
+        return self.details[f"issue:{issue_id}"]
+
+    def get_author_links(self, values, split=False):
+        return []
+
+    def load_fields(self, table, ids, fields):
+        return [{'id': row_id, **{name: self.rows[(table, row_id)].get(name) for name in fields}} for row_id in ids]
+
+
+def cached_pages(payloads):
+    """Render every issue page through the app
+    
+    Returns the bytes the page cache holds, and whether the cached rows are
+    still without their text afterwards.
+    """
+    db = CatalogueDatabase(payloads)
+    get_db_service = app_module.get_db_service
+    app_module.get_db_service = lambda: db
+    content_cache.set_warmer(None)
+    content_cache.clear()
+    try:
+        app_module._render_pages([f"/issue/{issue.id}" for issue in db.issues])
+        pages = sum(sys.getsizeof(value) for key, value in content_cache._entries.items() if key.startswith('page:'))
+        deferred = not any(article._is_set('content') for details in db.details.values()
+                           for article in details['featured_articles'])
+        return pages, deferred
+    finally:
+        app_module.get_db_service = get_db_service
+        content_cache.set_warmer(app_module.warm_pages)
+        content_cache.clear()
+
+
+def retained(build, payloads):
+    """Bytes still allocated once build() has returned and garbage is collected"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        catalogue = build(payloads)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del catalogue
+    return after - before
+
+
+def test_model_memory():
+    """Compare the retained size of the catalogue as dicts and as models"""
+    print(f"🔍 Measuring {ISSUES} issues ({ARTICLES_PER_ISSUE} articles, {CONTRIBUTORS_PER_ISSUE} contributors "
+          f"and {PHOTOS_PER_ISSUE} photos each)...")
+    payloads = synthetic_payloads()
+
+    results = [
+        ('dicts', retained(build_dicts, payloads)),
+        ('models, all columns', retained(lambda p: build_models(p, defer=False), payloads)),
+        ('models, text deferred', retained(lambda p: build_models(p, defer=True), payloads)),
+    ]
+
+    print("\n📦 Cached rows:")
+    report(results)
+
+    print(f"\n🔍 Rendering the {ISSUES} issue pages into the page cache...")
+    started = time.perf_counter()
+    pages, deferred = cached_pages(payloads)
+    print(f"ℹ️  {pages / 1024 / 1024:.1f} MB of rendered HTML ({pages / ISSUES / 1024:.1f} KB/page, "
+          f"rendered in {time.perf_counter() - started:.1f} s)")
+    print("\n📦 Cached rows plus rendered issue pages:")
+    report([(label, size + pages) for label, size in results])
+
+    ok = results[1][1] < results[0][1] and results[2][1] < results[1][1]
+    print(f"\n{'✅' if ok else '❌'} Models retain less than dicts")
+    print(f"{'✅' if deferred else '❌'} Rendering pages leaves the cached rows without their text")
+    return ok and deferred
+
+
+def report(results):
+    baseline = results[0][1]
+    for label, size in results:
+        change = '' if size == baseline else f" ({(size - baseline) / baseline:+.0%})"
+        print(f"   {label:<22} {size / 1024 / 1024:8.1f} MB  {size / ISSUES / 1024:6.1f} KB/issue{change}")
+
+
+if __name__ == "__main__":
+    success = test_model_memory()
+
+    if success:
+        print("\n🎉 The models shrink the cached catalogue!")
+    else:
+        print("\n💡 The models are not saving memory. Check models.py.")
+    sys.exit(0 if success else 1)